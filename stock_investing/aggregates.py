@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace stock_investing
+
+import numpy as np
+
+from stock_investing.analytics import (StockInvestorTask, compensated_sums_continued)
+from stock_investing.cache import month_interval
+from stock_investing.price_store import (COLUMN_DATE, EPOCH_ORDINAL)
+
+
+def busy_days(days, volumes, volume_mean):
+    """Days where volume was more than 10% higher than volume_mean.
+
+    :param days: int64 days since epoch
+    :param volumes: float64 volumes of days
+    :param volume_mean: mean volume of the whole range
+    :return: list of busy days
+    """
+    criteria_busy = np.flatnonzero(volume_busy(volumes, volume_mean))
+    return [
+        {'date': date, 'volume': int(day_volume), 'volume_mean': int(volume_mean)}
+        for date, day_volume in zip(
+            np.asarray(days)[criteria_busy].astype("datetime64[D]").astype(str).tolist(),
+            np.asarray(volumes)[criteria_busy]
+        )
+    ]
+
+
+def volume_busy(volumes, volume_mean):
+    return ((volumes - volume_mean) / volume_mean) * 100 > 10
+
+
+def month_summary(month, arrays):
+    """Symbol-month summary of a month's rows.
+
+    :param month: 'YYYY-MM'
+    :param arrays: dict: column arrays of month ordered by Date
+    :return: StockAggregates, without days
+    """
+    month_start, month_end = month_interval(month)
+    summary = StockAggregates(month_start)
+    summary.update(arrays, month_end)
+    return summary
+
+
+class StockAggregates(object):
+    """Aggregate state of a stock's prices over days [start, end] (date ordinals),
+        sufficient to answer the four tasks without its daily history:
+
+        + months: per 'YYYY-MM', sum and count of Open and of Close, sums
+          compensated as by the analytics engines (see compensated_sums()),
+          with their compensation so that a month's sums are continued exactly
+        + volume sum and count
+        + number of lose days (Close < Open)
+        + highest profit (High - Low) and its day, first day upon ties
+        + highest volume, overall and per month
+        + optionally (keep_days), day and volume of every day
+
+        Updated with days after end only, so that a daily run folds in one
+        day of data; persisted as a JSON-serializable dict.
+
+        Busy days depend upon the mean volume of the whole range: they are
+        looked for only within busy_months, those whose highest volume is busy.
+
+        Aggregates are mergeable: a symbol-month summary holds the above, so
+        that any range is answered by merging month summaries.
+    """
+    def __init__(self, start, end=None, keep_days=False):
+        """Initialize
+
+        :param start: date ordinal of first day aggregated
+        :param end: date ordinal of last day aggregated (high-water mark), None if none yet.
+        :param keep_days: Keep day and volume of every day.
+        """
+        self.start = start
+        self.end = end if end is not None else start - 1
+        self.keep_days = keep_days
+
+        self.months = {}
+        self.months_compensation = {}
+        self.volume_sum = 0.0
+        self.volume_count = 0
+        self.lose_days = 0
+        self.profit_max = None
+        self.profit_max_day = None
+        self.volume_max = None
+        self.months_volume_max = {}
+        self.days = np.empty(0, dtype=np.int64)
+        self.volumes = np.empty(0, dtype=np.float64)
+
+    @property
+    def volume_mean(self):
+        return self.volume_sum / self.volume_count if self.volume_count else None
+
+    def busy_months(self):
+        """Months whose highest volume is busy given the mean volume of all days aggregated.
+
+        :return: list of 'YYYY-MM'
+        """
+        volume_mean = self.volume_mean
+        if volume_mean is None:
+            return []
+        return sorted(
+            month for month, month_volume_max in self.months_volume_max.items()
+            if volume_busy(month_volume_max, volume_mean)
+        )
+
+    def update(self, arrays, end):
+        """Fold in days after current end, up to end.
+
+        :param arrays: dict: column arrays ordered by Date, Date as int64 days since epoch
+        :param end: date ordinal of new high-water mark
+        """
+        days = np.asarray(arrays.get(COLUMN_DATE, np.empty(0, dtype=np.int64)))
+        after = (days > self.end - EPOCH_ORDINAL) & (days <= end - EPOCH_ORDINAL)
+        self.end = max(self.end, end)
+        if not after.any():
+            return
+
+        days = days[after]
+        open_, close = arrays['Open'][after], arrays['Close'][after]
+        high, low = arrays['High'][after], arrays['Low'][after]
+        volume = arrays['Volume'][after]
+
+        months, month_index = np.unique(days.astype("datetime64[D]").astype("datetime64[M]"), return_inverse=True)
+        month_starts = np.flatnonzero(np.r_[True, month_index[1:] != month_index[:-1]])
+        months_state = [self.months.setdefault(str(month), [0.0, 0, 0.0, 0]) for month in months]
+        months_compensation = [self.months_compensation.setdefault(str(month), [0.0, 0.0]) for month in months]
+        for values, column in ((open_, 0), (close, 1)):
+            sums, compensation, counts = compensated_sums_continued(
+                values, month_starts,
+                [month_state[column * 2] for month_state in months_state],
+                [month_compensation[column] for month_compensation in months_compensation]
+            )
+            for month_state, month_compensation, month_sum, month_sum_compensation, month_count in zip(
+                months_state, months_compensation, sums, compensation, counts
+            ):
+                month_state[column * 2] = float(month_sum)
+                month_state[column * 2 + 1] += int(month_count)
+                month_compensation[column] = float(month_sum_compensation)
+
+        valid = ~np.isnan(volume)
+        self.volume_sum += float(volume[valid].sum())
+        self.volume_count += int(valid.sum())
+        if valid.any():
+            self.volume_max = max(float(volume[valid].max()), self.volume_max or 0.0)
+            volumes_max = np.full(len(months), -np.inf)
+            np.maximum.at(volumes_max, month_index[valid], volume[valid])
+            for month, month_volume_max in zip(months, volumes_max):
+                if month_volume_max > -np.inf:
+                    month = str(month)
+                    self.months_volume_max[month] = max(float(month_volume_max), self.months_volume_max.get(month, 0.0))
+        if self.keep_days:
+            self.days = np.concatenate((self.days, days[valid]))
+            self.volumes = np.concatenate((self.volumes, volume[valid]))
+
+        self.lose_days += int(np.count_nonzero(close < open_))
+
+        profit = high - low
+        if not np.isnan(profit).all():
+            index_max = int(np.nanargmax(profit))
+            if self.profit_max is None or profit[index_max] > self.profit_max:
+                self.profit_max = float(profit[index_max])
+                self.profit_max_day = int(days[index_max])
+
+    def merge(self, aggregates):
+        """Merge aggregates of following days, e.g. of next month.
+
+        :param aggregates: StockAggregates, its days after this one's.
+        """
+        self.start = min(self.start, aggregates.start)
+        self.end = max(self.end, aggregates.end)
+
+        for month, month_state in aggregates.months.items():
+            month_state_merged = self.months.setdefault(month, [0.0, 0, 0.0, 0])
+            for index, value in enumerate(month_state):
+                month_state_merged[index] += value
+            # Compensation of the month's first aggregates kept, a month split across aggregates being summed plainly.
+            self.months_compensation.setdefault(month, list(aggregates.months_compensation.get(month, [0.0, 0.0])))
+
+        self.volume_sum += aggregates.volume_sum
+        self.volume_count += aggregates.volume_count
+        if aggregates.volume_max is not None:
+            self.volume_max = max(aggregates.volume_max, self.volume_max or 0.0)
+        for month, month_volume_max in aggregates.months_volume_max.items():
+            self.months_volume_max[month] = max(month_volume_max, self.months_volume_max.get(month, 0.0))
+        self.lose_days += aggregates.lose_days
+
+        # First day upon ties
+        if aggregates.profit_max is not None and (self.profit_max is None or aggregates.profit_max > self.profit_max):
+            self.profit_max = aggregates.profit_max
+            self.profit_max_day = aggregates.profit_max_day
+
+        self.keep_days = self.keep_days and aggregates.keep_days
+        if self.keep_days:
+            self.days = np.concatenate((self.days, aggregates.days))
+            self.volumes = np.concatenate((self.volumes, aggregates.volumes))
+        else:
+            self.days = np.empty(0, dtype=np.int64)
+            self.volumes = np.empty(0, dtype=np.float64)
+
+    def results(self, tasks):
+        """Results of tasks for this stock, as keyed by stock within task results.
+
+        :param tasks: list of StockInvestorTask, busy day aside, see busy_months()
+        :return: dict: task to this stock's result, None if there is none.
+        """
+        results = {}
+        for task in tasks:
+            if task == StockInvestorTask.AVERAGE_MONTHLY_OPEN_CLOSE:
+                results[task] = [
+                    {
+                        'month': month,
+                        'average_open': round(open_sum / open_count, 2) if open_count else float('nan'),
+                        'average_close': round(close_sum / close_count, 2) if close_count else float('nan')
+                    }
+                    for month, (open_sum, open_count, close_sum, close_count) in sorted(self.months.items())
+                ]
+            elif task == StockInvestorTask.MAX_DAILY_PROFIT:
+                results[task] = None if self.profit_max is None else {
+                    'Date': str(np.datetime64(self.profit_max_day, 'D')),
+                    'Profit': self.profit_max
+                }
+            elif task == StockInvestorTask.BIGGEST_LOSER:
+                results[task] = self.lose_days
+
+        return results
+
+    def to_dict(self):
+        return {
+            "start": self.start,
+            "end": self.end,
+            "keep_days": self.keep_days,
+            "months": self.months,
+            "months_compensation": self.months_compensation,
+            "volume_sum": self.volume_sum,
+            "volume_count": self.volume_count,
+            "lose_days": self.lose_days,
+            "profit_max": self.profit_max,
+            "profit_max_day": self.profit_max_day,
+            "volume_max": self.volume_max,
+            "months_volume_max": self.months_volume_max,
+            "days": self.days.tolist(),
+            "volumes": self.volumes.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, value):
+        aggregates = cls(value["start"], value["end"], keep_days=value["keep_days"])
+        aggregates.months = {month: list(month_state) for month, month_state in value["months"].items()}
+        aggregates.months_compensation = {
+            month: list(month_compensation) for month, month_compensation in value["months_compensation"].items()
+        }
+        aggregates.volume_sum = value["volume_sum"]
+        aggregates.volume_count = value["volume_count"]
+        aggregates.lose_days = value["lose_days"]
+        aggregates.profit_max = value["profit_max"]
+        aggregates.profit_max_day = value["profit_max_day"]
+        aggregates.volume_max = value["volume_max"]
+        aggregates.months_volume_max = dict(value["months_volume_max"])
+        aggregates.days = np.array(value["days"], dtype=np.int64)
+        aggregates.volumes = np.array(value["volumes"], dtype=np.float64)
+        return aggregates
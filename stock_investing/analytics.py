@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace stock_investing
+
+import numpy as np
+
+class StockInvestorTask(object):
+    """ENUM
+    """
+    UNDEFINED = None
+    AVERAGE_MONTHLY_OPEN_CLOSE = "avg-monthly"
+    MAX_DAILY_PROFIT = "max-daily-profit"
+    BUSY_DAY = "busy-day"
+    BIGGEST_LOSER = "biggest-loser"
+
+    @staticmethod
+    def all():
+        return [
+            StockInvestorTask.AVERAGE_MONTHLY_OPEN_CLOSE,
+            StockInvestorTask.MAX_DAILY_PROFIT,
+            StockInvestorTask.BUSY_DAY,
+            StockInvestorTask.BIGGEST_LOSER,
+        ]
+
+    @staticmethod
+    def validate(value):
+        return value in StockInvestorTask.all()
+
+
+# Price columns read by each task, besides Date.
+TASK_COLUMNS = {
+    StockInvestorTask.AVERAGE_MONTHLY_OPEN_CLOSE: ["Open", "Close"],
+    StockInvestorTask.MAX_DAILY_PROFIT: ["High", "Low"],
+    StockInvestorTask.BUSY_DAY: ["Volume"],
+    StockInvestorTask.BIGGEST_LOSER: ["Open", "Close"],
+}
+
+
+def tasks_columns(tasks):
+    """Price columns needed to compute tasks, in first-needed order."""
+    columns = []
+    for task in tasks:
+        columns += [column for column in TASK_COLUMNS[task] if column not in columns]
+    return columns
+
+
+def average_monthly_open_close(df, stocks):
+    """Average Monthly Open and Close of every stock
+
+    :param df: DataFrame: Stock, Date and price columns
+    :param stocks: list: stock symbols
+    :return: dict: stock to list of monthly averages
+    """
+    year_month = df['Date'].dt.to_period('M').rename('YearMonth')
+    df_mean = df[['Open', 'Close']].groupby([df['Stock'], year_month], observed=True, sort=True).mean()
+
+    average_monthly_open_close = {stock: [] for stock in stocks}
+    for (stock, month), average_open, average_close in zip(df_mean.index, df_mean['Open'], df_mean['Close']):
+        average_entry = {
+            'month': str(month),
+            'average_open': round(average_open, 2),
+            'average_close': round(average_close, 2)
+        }
+        average_monthly_open_close[stock] += [average_entry]
+
+    return average_monthly_open_close
+
+
+def max_daily_profit(df, stocks):
+    """Day providing the highest profit (High - Low) of every stock
+
+    :param df: DataFrame: Stock, Date and price columns
+    :param stocks: list: stock symbols
+    :return: dict: stock to {'Date', 'Profit'}
+    """
+    profit = df['High'] - df['Low']
+    index_max = profit.groupby(df['Stock'], observed=True).idxmax().dropna()
+
+    dates = df['Date'][index_max.values].dt.strftime("%Y-%m-%d")
+    profits = profit[index_max.values]
+
+    by_stock = {
+        stock: {'Date': date, 'Profit': float(value)}
+        for stock, date, value in zip(index_max.index, dates, profits)
+    }
+
+    return {stock: by_stock[stock] for stock in stocks if stock in by_stock}
+
+
+def busy_day(df, stocks):
+    """Days where volume was more than 10% higher than average volume of every stock
+
+    :param df: DataFrame: Stock, Date and price columns
+    :param stocks: list: stock symbols
+    :return: dict: stock to list of busy days
+    """
+    volume = df['Volume']
+    volume_mean = volume.groupby(df['Stock'], observed=True).transform('mean')
+
+    volume_high = ((volume - volume_mean) / volume_mean) * 100
+    criteria_busy = volume_high > 10
+
+    busy_day = {stock: [] for stock in stocks}
+    for stock, date, day_volume, stock_volume_mean in zip(
+        df['Stock'][criteria_busy],
+        df['Date'][criteria_busy].dt.strftime("%Y-%m-%d"),
+        volume[criteria_busy],
+        volume_mean[criteria_busy],
+    ):
+        volume_entry = {
+            'date': date,
+            'volume': int(day_volume),
+            'volume_mean': int(stock_volume_mean)
+        }
+        busy_day[stock] += [volume_entry]
+
+    return busy_day
+
+
+def lose_days(df, stocks):
+    """Number of days where Close was lower than Open of every stock
+
+    :param df: DataFrame: Stock, Date and price columns
+    :param stocks: list: stock symbols
+    :return: dict: stock to number of lose days
+    """
+    lose = (df['Close'] < df['Open']).groupby(df['Stock'], observed=True).sum()
+    lose = lose.reindex(stocks, fill_value=0)
+
+    return {stock: int(number_of_lose_days) for stock, number_of_lose_days in lose.items()}
+
+
+def biggest_loser(lose_days):
+    """Stock having the most lose days, first stock upon ties.
+
+    :param lose_days: dict: stock to number of lose days
+    :return: dict: {stock: number of lose days}
+    """
+    biggest_loser = None
+    for vstock, vnumber_of_lose_days in lose_days.items():
+        if not biggest_loser:
+            biggest_loser = {vstock: vnumber_of_lose_days}
+            continue
+
+        stock = list(biggest_loser.keys())[0]
+        number_of_lose_days = biggest_loser[stock]
+
+        if vnumber_of_lose_days > number_of_lose_days:
+            biggest_loser = {vstock: vnumber_of_lose_days}
+
+    return biggest_loser
+
+
+class StockInvestorAnalytics(object):
+    """Multi-task analytics engine: each requested task is a single vectorized
+        groupby over the whole assembled price table, without per-stock copies.
+    """
+    _TASKS = {
+        StockInvestorTask.AVERAGE_MONTHLY_OPEN_CLOSE: average_monthly_open_close,
+        StockInvestorTask.MAX_DAILY_PROFIT: max_daily_profit,
+        StockInvestorTask.BUSY_DAY: busy_day,
+        StockInvestorTask.BIGGEST_LOSER: lose_days,
+    }
+
+    def __init__(self, df, stocks):
+        """Initialize
+
+        :param df: DataFrame: Stock, Date and price columns
+        :param stocks: list: stock symbols, ordering results
+        """
+        self.df = df
+        self.stocks = stocks
+
+    def run(self, tasks):
+        """Compute requested tasks
+
+        :param tasks: list of StockInvestorTask
+        :return: dict: task to its result
+        """
+        for task in tasks:
+            assert StockInvestorTask.validate(task), task
+
+        results = {}
+        for task in tasks:
+            result = self.compute(task)
+
+            if task == StockInvestorTask.BIGGEST_LOSER:
+                result = biggest_loser(result)
+
+            results[task] = result
+
+        return results
+
+    def compute(self, task):
+        return self._TASKS[task](self.df, self.stocks)
+
+
+#
+# Array kernels: the same tasks computed over per-stock column arrays (e.g. slices
+# of a memory-mapped dataset), each slice ordered by Date as int64 days since epoch.
+#
+def _month_starts(days):
+    """Offsets of the first day of each calendar month within ordered days."""
+    months = np.asarray(days).astype("datetime64[D]").astype("datetime64[M]")
+    return np.flatnonzero(np.r_[True, months[1:] != months[:-1]]), months
+
+
+def compensated_sums(values, starts):
+    """Sum and count of each run of values beginning at starts, skipping NaN.
+
+    Values of a run are summed in order with Kahan compensation, as in pandas
+    groupby mean, so that averages rounded to cents match those of the
+    DataFrame engine; all runs are summed at once, one position at a time.
+
+    :param values: float64 values
+    :param starts: ascending offsets of the first value of each run, the first one 0
+    :return: (sums, counts)
+    """
+    sums, _, counts = compensated_sums_continued(values, starts, np.zeros(len(starts)), np.zeros(len(starts)))
+    return sums, counts
+
+
+def compensated_sums_continued(values, starts, sums, compensation):
+    """Sum and count of each run of values beginning at starts, skipping NaN,
+    continuing compensated sums of values preceding each run.
+
+    :param values: float64 values
+    :param starts: ascending offsets of the first value of each run, the first one 0
+    :param sums: float64 sums of values preceding each run
+    :param compensation: float64 compensation of sums of values preceding each run
+    :return: (sums, compensation, counts), counts of values of runs alone
+    """
+    values = np.asarray(values, dtype=np.float64)
+    runs = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(values)]))
+    valid = ~np.isnan(values)
+    values, runs = values[valid], runs[valid]
+
+    counts = np.bincount(runs, minlength=len(starts))
+    sums = np.array(sums, dtype=np.float64)
+    compensation = np.array(compensation, dtype=np.float64)
+    if not len(values):
+        return sums, compensation, counts
+
+    # Position of each value within its run, valid values alone
+    positions = np.arange(len(values)) - np.repeat(np.cumsum(counts) - counts, counts)
+    matrix = np.zeros((len(starts), int(counts.max())))
+    matrix[runs, positions] = values
+
+    for position in range(matrix.shape[1]):
+        within = counts > position
+        adjusted = matrix[:, position] - compensation
+        updated = sums + adjusted
+        updated_compensation = (updated - sums) - adjusted
+        updated_compensation[np.isnan(updated_compensation)] = 0.0
+        sums = np.where(within, updated, sums)
+        compensation = np.where(within, updated_compensation, compensation)
+
+    return sums, compensation, counts
+
+
+def _nanmean_reduceat(values, starts):
+    """Mean of each run of values beginning at starts, skipping NaN."""
+    sums, counts = compensated_sums(values, starts)
+    return np.divide(sums, counts, out=np.full(len(starts), np.nan), where=counts > 0)
+
+
+def average_monthly_open_close_arrays(slices, stocks):
+    """Average Monthly Open and Close of every stock
+
+    :param slices: dict: stock to column arrays
+    :param stocks: list: stock symbols
+    :return: dict: stock to list of monthly averages
+    """
+    average_monthly_open_close = {stock: [] for stock in stocks}
+    for stock in stocks:
+        arrays = slices.get(stock)
+        if not arrays or not len(arrays['Date']):
+            continue
+
+        starts, months = _month_starts(arrays['Date'])
+        averages_open = _nanmean_reduceat(arrays['Open'], starts)
+        averages_close = _nanmean_reduceat(arrays['Close'], starts)
+
+        for month, average_open, average_close in zip(months[starts], averages_open, averages_close):
+            average_entry = {
+                'month': str(month),
+                'average_open': round(float(average_open), 2),
+                'average_close': round(float(average_close), 2)
+            }
+            average_monthly_open_close[stock] += [average_entry]
+
+    return average_monthly_open_close
+
+
+def max_daily_profit_arrays(slices, stocks):
+    """Day providing the highest profit (High - Low) of every stock
+
+    :param slices: dict: stock to column arrays
+    :param stocks: list: stock symbols
+    :return: dict: stock to {'Date', 'Profit'}
+    """
+    max_daily_profit = {}
+    for stock in stocks:
+        arrays = slices.get(stock)
+        if not arrays:
+            continue
+
+        profit = arrays['High'] - arrays['Low']
+        if np.isnan(profit).all():
+            continue
+
+        index_max = int(np.nanargmax(profit))
+        max_daily_profit[stock] = {
+            'Date': str(np.datetime64(int(arrays['Date'][index_max]), 'D')),
+            'Profit': float(profit[index_max])
+        }
+
+    return max_daily_profit
+
+
+def busy_day_arrays(slices, stocks):
+    """Days where volume was more than 10% higher than average volume of every stock
+
+    :param slices: dict: stock to column arrays
+    :param stocks: list: stock symbols
+    :return: dict: stock to list of busy days
+    """
+    busy_day = {stock: [] for stock in stocks}
+    for stock in stocks:
+        arrays = slices.get(stock)
+        if not arrays or np.isnan(arrays['Volume']).all():
+            continue
+
+        volume = arrays['Volume']
+        volume_mean = float(np.nanmean(volume))
+
+        volume_high = ((volume - volume_mean) / volume_mean) * 100
+        criteria_busy = np.flatnonzero(volume_high > 10)
+
+        dates = arrays['Date'][criteria_busy].astype("datetime64[D]").astype(str).tolist()
+        for date, day_volume in zip(dates, volume[criteria_busy]):
+            volume_entry = {
+                'date': date,
+                'volume': int(day_volume),
+                'volume_mean': int(volume_mean)
+            }
+            busy_day[stock] += [volume_entry]
+
+    return busy_day
+
+
+def lose_days_arrays(slices, stocks):
+    """Number of days where Close was lower than Open of every stock
+
+    :param slices: dict: stock to column arrays
+    :param stocks: list: stock symbols
+    :return: dict: stock to number of lose days
+    """
+    return {
+        stock: int(np.count_nonzero(slices[stock]['Close'] < slices[stock]['Open'])) if slices.get(stock) else 0
+        for stock in stocks
+    }
+
+
+class StockInvestorArrayAnalytics(StockInvestorAnalytics):
+    """Multi-task analytics engine over per-stock column arrays, such as
+        zero-copy slices of a memory-mapped StockInvestorDataset, without
+        assembling a DataFrame.
+    """
+    _TASKS = {
+        StockInvestorTask.AVERAGE_MONTHLY_OPEN_CLOSE: average_monthly_open_close_arrays,
+        StockInvestorTask.MAX_DAILY_PROFIT: max_daily_profit_arrays,
+        StockInvestorTask.BUSY_DAY: busy_day_arrays,
+        StockInvestorTask.BIGGEST_LOSER: lose_days_arrays,
+    }
+
+    def __init__(self, slices, stocks):
+        """Initialize
+
+        :param slices: dict: stock to column arrays, ordered by Date
+        :param stocks: list: stock symbols, ordering results
+        """
+        self.slices = slices
+        self.stocks = stocks
+
+    def compute(self, task):
+        return self._TASKS[task](self.slices, self.stocks)
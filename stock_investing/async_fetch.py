@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace stock_investing
+
+import asyncio
+import logging
+
+import aiohttp
+from pyhttpstatus_utils import HttpStatusCode
+
+from stock_investing.rate_limit import RateLimitQuotaExceeded
+from stock_investing.support import get_exception_message
+
+log = logging.getLogger(__name__)
+
+
+class StockInvestorAsyncFetch(object):
+    """asyncio ingestion engine: drives all StockInvestorRequest tasks through a
+        single event loop with one aiohttp session, bounding in-flight requests
+        with a concurrency semaphore instead of OS threads.
+
+        With a rate limiter, each request waits upon it, and throttled requests
+        are retried as paced by it rather than after a fixed sleep.
+    """
+    _CONCURRENCY = 100
+    _REQUEST_TIMEOUT_SECS = 10
+    _RETRY_SLEEP_SECS = 1
+    _MAX_REQUEST_TRIES = 10
+
+    @property
+    def concurrency(self):
+        return self.__concurrency
+    @concurrency.setter
+    def concurrency(self, value):
+        self.__concurrency = value
+
+    def __init__(self, api_key, process_response, concurrency=None, rate_limiter=None, logger=None):
+        """Initialize
+
+        :param api_key: Quandl WIKI API Key
+        :param process_response: callable(wreq, status_code, content) returning StockInvestorResponse
+        :param concurrency: Maximum number of in-flight requests
+        :param rate_limiter: StockInvestorRateLimiter consulted before each request.
+        :param logger:
+        """
+        assert api_key
+        assert process_response
+
+        self.api_key = api_key
+        self.process_response = process_response
+        self.concurrency = concurrency or self._CONCURRENCY
+        self.rate_limiter = rate_limiter
+        self.logger = logger or log
+
+    def run(self, wreqs, on_response):
+        """Fetch all requests within a new event loop.
+
+        :param wreqs: list of StockInvestorRequest
+        :param on_response: callable(StockInvestorResponse), invoked once per completed
+            response from the event loop thread.
+        """
+        asyncio.run(self.fetch_all(wreqs, on_response))
+
+    async def fetch_all(self, wreqs, on_response):
+        from pyfortified_requests.support import HEADER_CONTENT_TYPE_APP_JSON
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self._REQUEST_TIMEOUT_SECS)
+
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout, headers=HEADER_CONTENT_TYPE_APP_JSON
+        ) as session:
+            tasks = [self.fetch(session, semaphore, wreq) for wreq in wreqs]
+            for task in asyncio.as_completed(tasks):
+                wresp = await task
+                if not wresp:
+                    self.logger.warning("No response")
+                    continue
+
+                on_response(wresp)
+
+    async def fetch(self, session, semaphore, wreq):
+        """Processes a single request to QUANDL WIKI API
+
+        :param session: aiohttp.ClientSession
+        :param semaphore: asyncio.Semaphore
+        :param wreq: StockInvestorRequest
+        :return: StockInvestorResponse
+        """
+        request_params = wreq.request_params
+        request_label = wreq.request_label
+
+        async with semaphore:
+            tries = 0
+            while True:
+                tries += 1
+                self.logger.debug(
+                    "Async Request",
+                    extra={
+                        'request_url': wreq.request_url,
+                        'request_label': request_label,
+                        'tries': tries})
+
+                try:
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.quota_check()
+                        await self.rate_limiter.acquire_async()
+
+                    async with session.get(wreq.request_url, params=request_params) as response:
+                        status_code = response.status
+                        content = await response.read()
+
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.update(status_code, response.headers)
+                except (aiohttp.ClientError, asyncio.TimeoutError, RateLimitQuotaExceeded) as ex:
+                    self.logger.error(
+                        "Async Request Error",
+                        extra={
+                            "request_url": wreq.request_url,
+                            "error": get_exception_message(ex)
+                        }
+                    )
+                    return None
+
+                if status_code == HttpStatusCode.TOO_MANY_REQUESTS and tries < self._MAX_REQUEST_TRIES:
+                    self.logger.warning(
+                        "Async Request Retry",
+                        extra={
+                            "request_url": wreq.request_url,
+                            "request_label": request_label
+                        }
+                    )
+                    if self.rate_limiter is None:
+                        await asyncio.sleep(self._RETRY_SLEEP_SECS)
+                    continue
+
+                break
+
+        return self.process_response(wreq, status_code, content)
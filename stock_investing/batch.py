@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace stock_investing
+
+import os
+import logging
+import datetime as dt
+from concurrent import futures
+
+import ujson as json
+
+from stock_investing.analytics import StockInvestorTask
+from stock_investing.cache import (intervals_merge, months_within)
+from stock_investing.server import (StockInvestorSnapshot, StockInvestorQueryError, json_dumps)
+
+log = logging.getLogger(__name__)
+
+
+def batch_job(value, defaults):
+    """Normalize a batch job, its omitted fields taken from defaults.
+
+    A job is a JSON object of the command line options:
+    {"id": ..., "stocks": [...] or "A,B", "start-date": "YYYY-MM-DD", "end-date": "YYYY-MM-DD",
+    "task": Task or "tasks": [Task, ...]}; a single "task" yields its result alone.
+
+    :param value: dict: job as read
+    :param defaults: dict: "stocks", "start-date", "end-date", "task", "tasks" of command line
+    :return: dict: "id", "stocks", "start", "end" (date ordinals), "tasks", "task"
+    """
+    if not isinstance(value, dict):
+        raise StockInvestorQueryError("Job is not an object")
+
+    stocks = value.get("stocks") or defaults["stocks"]
+    if isinstance(stocks, str):
+        stocks = stocks.split(",")
+
+    task = value.get("task")
+    tasks = value.get("tasks")
+    if task is None and tasks is None:
+        task, tasks = defaults.get("task"), defaults.get("tasks")
+    tasks = tasks or [task or StockInvestorTask.AVERAGE_MONTHLY_OPEN_CLOSE]
+    if isinstance(tasks, str):
+        tasks = tasks.split(",")
+    if not all(StockInvestorTask.validate(task) for task in tasks):
+        raise StockInvestorQueryError("Invalid tasks: {}".format(tasks))
+
+    try:
+        start = dt.datetime.strptime(value.get("start-date") or defaults["start-date"], "%Y-%m-%d").toordinal()
+        end = dt.datetime.strptime(value.get("end-date") or defaults["end-date"], "%Y-%m-%d").toordinal()
+    except (TypeError, ValueError) as ex:
+        raise StockInvestorQueryError(str(ex))
+
+    # As command line dates: end at most yesterday, start at most end.
+    end = min(end, dt.date.today().toordinal() - 1)
+    start = min(start, end)
+
+    return {
+        "id": value.get("id"),
+        "stocks": stocks,
+        "start": start,
+        "end": end,
+        "tasks": tasks,
+        "task": task if task is not None and tasks == [task] else None,
+    }
+
+
+class StockInvestorBatch(object):
+    """Batch of task query jobs, read from a JSONL file, answered in one process.
+
+        Fetches of all jobs are planned together: the days needed by jobs are
+        merged per stock into intervals, so that symbol-months shared by
+        several jobs are served from cache or fetched once, by a single
+        StockInvestor over the union of stocks. Jobs then run concurrently
+        over one shared StockInvestorSnapshot of the collected data, and their
+        results are written as JSONL in job order, each as soon as it and the
+        jobs before it completed.
+
+        A job failing to parse or compute yields an "error" line instead of a
+        "result" line, without stopping the batch.
+    """
+    def __init__(self, investor_factory, defaults, workers=None, logger=None):
+        """Initialize
+
+        :param investor_factory: callable(stocks, start_datetime, end_datetime, tasks) returning StockInvestor
+        :param defaults: dict: job fields when omitted, see batch_job()
+        :param workers: Number of jobs computed concurrently, default: number of CPUs
+        :param logger:
+        """
+        self.logger = logger or log
+        self.investor_factory = investor_factory
+        self.defaults = defaults
+        self.workers = workers or os.cpu_count() or 1
+
+    def read(self, path):
+        """Jobs of JSONL file, each normalized or {"id", "error"}; blank lines skipped.
+
+        :param path: JSONL file path
+        :return: list of dict
+        """
+        jobs = []
+        with open(path, "rb") as jobs_file:
+            for line_number, line in enumerate(jobs_file, start=1):
+                if not line.strip():
+                    continue
+                value = None
+                try:
+                    value = json.loads(line)
+                    jobs.append(batch_job(value, self.defaults))
+                except (ValueError, StockInvestorQueryError) as ex:
+                    job_id = value.get("id") if isinstance(value, dict) else None
+                    jobs.append({"id": job_id, "line": line_number, "error": str(ex)})
+        return jobs
+
+    def run(self, path, output):
+        """Answer jobs of JSONL file.
+
+        :param path: JSONL file path
+        :param output: binary stream, JSONL results are written to
+        :return: dict: batch summary
+        """
+        jobs = self.read(path)
+        valid_jobs = [job for job in jobs if "error" not in job]
+
+        snapshot = self.load(valid_jobs) if valid_jobs else None
+
+        errors = 0
+        with futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for job_result in executor.map(lambda job: self.job_run(snapshot, job), jobs):
+                errors += "error" in job_result
+                output.write(json_dumps(job_result) + b"\n")
+                output.flush()
+
+        summary = {"jobs": len(jobs), "errors": errors}
+        if snapshot is not None:
+            summary.update({"stocks": len(snapshot.stocks), "rows": snapshot.rows})
+        self.logger.info("Batch: Completed", extra=summary)
+        return summary
+
+    def load(self, jobs):
+        """Fetch, or serve from cache, days needed by jobs, once per stock and day.
+
+        :param jobs: list of normalized jobs
+        :return: StockInvestorSnapshot
+        """
+        stocks_intervals = {}
+        tasks = []
+        for job in jobs:
+            for stock in job["stocks"]:
+                stocks_intervals.setdefault(stock, []).append([job["start"], job["end"]])
+            tasks += [task for task in job["tasks"] if task not in tasks]
+
+        stocks_months = {
+            stock: [month for start, end in intervals_merge(intervals) for month in months_within(start, end)]
+            for stock, intervals in stocks_intervals.items()
+        }
+        self.logger.debug("Batch: Plan", extra={
+            'jobs': len(jobs),
+            'stocks': len(stocks_months),
+            'months': sum(len(months) for months in stocks_months.values()),
+        })
+
+        investor = self.investor_factory(
+            list(stocks_months),
+            dt.datetime.fromordinal(min(job["start"] for job in jobs)),
+            dt.datetime.fromordinal(max(job["end"] for job in jobs)),
+            tasks
+        )
+        investor.work_fetch_months(stocks_months)
+        return StockInvestorSnapshot.from_investor(investor)
+
+    def job_run(self, snapshot, job):
+        """Compute a job over snapshot.
+
+        :return: dict: {"id", "result"}, or {"id", "error"}
+        """
+        if "error" in job:
+            return job
+
+        try:
+            results = snapshot.query(
+                job["tasks"],
+                stocks=job["stocks"],
+                start_date=dt.date.fromordinal(job["start"]).isoformat(),
+                end_date=dt.date.fromordinal(job["end"]).isoformat()
+            )
+        except Exception as ex:
+            return {"id": job["id"], "error": str(ex) or type(ex).__name__}
+
+        return {"id": job["id"], "result": results[job["task"]] if job["task"] else results}
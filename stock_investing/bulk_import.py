@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace stock_investing
+
+import io
+import os
+import gzip
+import logging
+import itertools
+from collections import deque
+from concurrent import futures
+
+import numpy as np
+import pandas as pd
+
+from stock_investing import codec
+from stock_investing.aggregates import month_summary
+from stock_investing.cache import (
+    StockInvestorCache,
+    StockInvestorCacheIndex,
+    CACHE_DIR_DEFAULT,
+    month_cache_key,
+    stock_cache_key,
+)
+from stock_investing.price_store import (StockPriceStore, COLUMN_DATE, EPOCH_ORDINAL, dates_to_days)
+from stock_investing.rollup import StockMonthlyRollup
+
+log = logging.getLogger(__name__)
+
+# Quandl WIKI_PRICES export columns to WIKI dataset API columns.
+WIKI_PRICES_TICKER = "ticker"
+WIKI_PRICES_COLUMNS = {
+    "date": "Date",
+    "open": "Open",
+    "high": "High",
+    "low": "Low",
+    "close": "Close",
+    "volume": "Volume",
+    "ex-dividend": "Ex-Dividend",
+    "split_ratio": "Split Ratio",
+    "adj_open": "Adj. Open",
+    "adj_high": "Adj. High",
+    "adj_low": "Adj. Low",
+    "adj_close": "Adj. Close",
+    "adj_volume": "Adj. Volume",
+}
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def wiki_prices_open(path):
+    """Open a WIKI_PRICES CSV export, gzipped or plain, as a binary stream."""
+    with open(path, "rb") as csv_file:
+        magic = csv_file.read(len(_GZIP_MAGIC))
+    if magic == _GZIP_MAGIC:
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def wiki_prices_parse(header, chunk, stocks=None):
+    """Parse a chunk of WIKI_PRICES CSV lines, partitioned by ticker and month.
+
+    Runs within a worker process.
+
+    :param header: list: CSV column names
+    :param chunk: bytes: CSV lines, without header
+    :param stocks: set: stock symbols to keep, None for all
+    :return: list of (ticker, 'YYYY-MM', columns, arrays), Date as int64 days since epoch
+    """
+    df = pd.read_csv(
+        io.BytesIO(chunk),
+        names=header,
+        header=None,
+        dtype={WIKI_PRICES_TICKER: str, "date": str},
+        float_precision="round_trip",
+    )
+    if stocks is not None:
+        df = df[df[WIKI_PRICES_TICKER].isin(stocks)]
+    if df.empty:
+        return []
+
+    columns = [WIKI_PRICES_COLUMNS.get(name, name) for name in header if name != WIKI_PRICES_TICKER]
+
+    tickers = df[WIKI_PRICES_TICKER].to_numpy()
+    days = dates_to_days(df["date"].to_numpy())
+    months = days.astype("datetime64[D]").astype("datetime64[M]")
+
+    order = np.lexsort((days, months, tickers))
+    tickers, days, months = tickers[order], days[order], months[order]
+    values = {
+        WIKI_PRICES_COLUMNS.get(name, name): df[name].to_numpy(dtype=np.float64)[order]
+        for name in header if name not in (WIKI_PRICES_TICKER, "date")
+    }
+    values[COLUMN_DATE] = days
+
+    # Boundaries of runs of equal (ticker, month)
+    change = np.flatnonzero((tickers[1:] != tickers[:-1]) | (months[1:] != months[:-1])) + 1
+    bounds = np.concatenate(([0], change, [len(days)]))
+
+    partitions = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        partitions.append((
+            tickers[start],
+            str(months[start]),
+            columns,
+            {column: array[start:end] for column, array in values.items()}
+        ))
+
+    return partitions
+
+
+class StockInvestorBulkImport(object):
+    """Offline backfill from a local WIKI_PRICES CSV export (possibly gzipped).
+
+        The file is streamed in chunks of lines parsed by a pool of worker
+        processes, with a bounded number of chunks in flight, so memory use is
+        independent of file size. Rows are partitioned by ticker and month into
+        the same symbol-month cache entries and summaries, per-symbol columns,
+        monthly rollups and cache index intervals that StockInvestor looks up.
+    """
+    _CHUNK_LINES = 250000
+    _CACHE_GROUP_NAME = "data"
+
+    def __init__(self, cache_dir=CACHE_DIR_DEFAULT, stocks=None, workers=None, chunk_lines=None, logger=None):
+        """Initialize
+
+        :param cache_dir: Local on-disk cache tier, None disables it.
+        :param stocks: list: stock symbols to import, None for all
+        :param workers: Number of parsing processes, default: number of CPUs
+        :param chunk_lines: Number of CSV lines per parsed chunk
+        :param logger:
+        """
+        self.logger = logger or log
+        self.cache = StockInvestorCache(cache_name="stock-investor", cache_dir=cache_dir, logger=self.logger)
+        self.cache_index = StockInvestorCacheIndex(self.cache)
+        self.stocks = set(stocks) if stocks else None
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_lines = chunk_lines or self._CHUNK_LINES
+
+        self.__written = set()
+        self.__pending = None
+        self.__stocks_range = {}
+        self.__stocks_columns = {}
+        self.__stocks_rollups = {}
+
+    def run(self, path):
+        """Import WIKI_PRICES CSV export into cache.
+
+        :param path: CSV file path, gzipped or plain
+        :return: dict: import summary
+        """
+        rows = 0
+        with wiki_prices_open(path) as csv_file:
+            header = csv_file.readline().decode("utf-8").strip().split(",")
+            assert WIKI_PRICES_TICKER in header and "date" in header, header
+
+            with futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
+                in_flight = deque()
+                while True:
+                    chunk = b"".join(itertools.islice(csv_file, self.chunk_lines))
+                    if chunk:
+                        in_flight.append(executor.submit(wiki_prices_parse, header, chunk, self.stocks))
+
+                    # Chunks consumed in file order, at most workers + 1 in flight.
+                    while in_flight and (not chunk or len(in_flight) > self.workers):
+                        for partition in in_flight.popleft().result():
+                            rows += len(partition[3][COLUMN_DATE])
+                            self.partition_merge(*partition)
+
+                    if not chunk:
+                        break
+
+        self.partition_flush()
+
+        for stock, (start_day, end_day) in self.__stocks_range.items():
+            start, end = [int(day) + EPOCH_ORDINAL for day in (start_day, end_day)]
+            self.cache_index.add(stock, start, end)
+
+        for stock, rollup in self.__stocks_rollups.items():
+            self.cache.put(
+                cache_key=stock_cache_key(stock, "rollup"), cache_value=rollup.to_dict(), cache_group_name="rollup"
+            )
+
+        summary = {
+            "stocks": len(self.__stocks_range),
+            "months": len(self.__written),
+            "rows": rows,
+        }
+        self.logger.info("Bulk Import: Completed", extra=summary)
+        return summary
+
+    def partition_merge(self, stock, month, columns, arrays):
+        """Accumulate a parsed symbol-month partition. A month may span chunk
+        boundaries, so the last partition seen is held until the next one differs.
+        """
+        days = arrays[COLUMN_DATE]
+        start_day, end_day = self.__stocks_range.get(stock, (days[0], days[-1]))
+        self.__stocks_range[stock] = (min(start_day, days[0]), max(end_day, days[-1]))
+
+        if self.__stocks_columns.get(stock) != columns:
+            self.__stocks_columns[stock] = columns
+            self.cache.put(
+                cache_key=stock_cache_key(stock, "columns"), cache_value=columns, cache_group_name="columns"
+            )
+
+        if self.__pending is not None and self.__pending[:2] != (stock, month):
+            self.partition_flush()
+
+        if self.__pending is None:
+            self.__pending = (stock, month, StockPriceStore(columns))
+        self.__pending[2].append_arrays(arrays)
+
+    def partition_flush(self):
+        """Write pending symbol-month partition as its cache entry."""
+        if self.__pending is None:
+            return
+
+        stock, month, month_data = self.__pending
+        self.__pending = None
+
+        cache_key = month_cache_key(stock, month, self._CACHE_GROUP_NAME)
+        if cache_key in self.__written:
+            # Unsorted export: merge with entry already written by this import.
+            cache_value, _ = self.cache.get(cache_key=cache_key, cache_group_name=self._CACHE_GROUP_NAME, binary=True)
+            if cache_value is not None:
+                cached_columns, cached_arrays = codec.decode(cache_value)
+                merged = StockPriceStore(cached_columns)
+                merged.append_arrays(cached_arrays)
+                merged.append_arrays(month_data.to_dict())
+                month_data = merged
+
+        month_data.sort()
+        self.cache.put(
+            cache_key=cache_key,
+            cache_value=codec.encode(month_data.columns, month_data.to_dict()),
+            cache_group_name=self._CACHE_GROUP_NAME
+        )
+        self.cache.put(
+            cache_key=month_cache_key(stock, month, "summary"),
+            cache_value=month_summary(month, month_data.to_dict()).to_dict(),
+            cache_group_name="summary"
+        )
+        self.stock_rollup(stock).update(month, month_data.to_dict())
+        self.__written.add(cache_key)
+
+    def stock_rollup(self, stock):
+        """Monthly rollup of stock, as stored by earlier imports or fetches, updated by this import."""
+        if stock not in self.__stocks_rollups:
+            rollup, _ = self.cache.get(cache_key=stock_cache_key(stock, "rollup"), cache_group_name="rollup")
+            self.__stocks_rollups[stock] = StockMonthlyRollup.from_dict(rollup) if rollup else StockMonthlyRollup()
+        return self.__stocks_rollups[stock]
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace stock_investing
+
+import os
+import datetime as dt
+import pickle
+import tempfile
+import zlib
+import logging
+
+from pyfortified_cache import (CacheClient, create_cache_key)
+from pyfortified_cache.constants import SECONDS_FOR_30_MINUTES
+
+from stock_investing.support import get_exception_message
+
+log = logging.getLogger(__name__)
+
+CACHE_DIR_DEFAULT = os.path.join(os.path.expanduser("~"), ".stock-investor", "cache")
+
+
+def month_cache_key(stock, month, cache_group_name):
+    """Cache key of a symbol-month entry, independent of requested date range.
+
+    :param stock: Stock symbol
+    :param month: 'YYYY-MM'
+    :param cache_group_name:
+    """
+    return create_cache_key(
+        request_params={"stock": stock, "month": month},
+        cache_group_name=cache_group_name,
+        client_unique_hash=None
+    )
+
+
+def stock_cache_key(stock, cache_group_name):
+    """Cache key of a per-symbol entry."""
+    return create_cache_key(
+        request_params={"stock": stock},
+        cache_group_name=cache_group_name,
+        client_unique_hash=None
+    )
+
+
+def stock_column_cache_key(stock, column, cache_group_name):
+    """Cache key of a per-symbol entry of a single column."""
+    return create_cache_key(
+        request_params={"stock": stock, "column": column},
+        cache_group_name=cache_group_name,
+        client_unique_hash=None
+    )
+
+
+def stock_start_cache_key(stock, start_date, cache_group_name):
+    """Cache key of a per-symbol entry covering days from start_date."""
+    return create_cache_key(
+        request_params={"stock": stock, "start_date": start_date},
+        cache_group_name=cache_group_name,
+        client_unique_hash=None
+    )
+
+
+def day_cache_key(date, cache_group_name):
+    """Cache key of a per-day entry, e.g. requests issued against a daily quota."""
+    return create_cache_key(
+        request_params={"date": date},
+        cache_group_name=cache_group_name,
+        client_unique_hash=None
+    )
+
+
+#
+# Intervals: inclusive [start, end] pairs of date ordinals (datetime.date.toordinal())
+#
+def date_to_ordinal(date):
+    """'YYYY-MM-DD' to date ordinal"""
+    return dt.datetime.strptime(date, "%Y-%m-%d").toordinal()
+
+
+def ordinal_to_date(ordinal):
+    """Date ordinal to 'YYYY-MM-DD'"""
+    return dt.date.fromordinal(ordinal).strftime("%Y-%m-%d")
+
+
+def month_interval(month):
+    """'YYYY-MM' to [first, last] date ordinals of month"""
+    first = dt.datetime.strptime(month, "%Y-%m").date()
+    next_month = (first.replace(day=28) + dt.timedelta(days=4)).replace(day=1)
+    return [first.toordinal(), next_month.toordinal() - 1]
+
+
+def months_within(start, end):
+    """Calendar months overlapping [start, end] date ordinals.
+
+    :return: list of ['YYYY-MM', start, end], clipped to [start, end]
+    """
+    months = []
+    while start <= end:
+        month = dt.date.fromordinal(start).strftime("%Y-%m")
+        month_end = min(month_interval(month)[1], end)
+        months.append([month, start, month_end])
+        start = month_end + 1
+    return months
+
+
+def intervals_merge(intervals):
+    """Sort and merge overlapping or adjacent intervals."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def intervals_intersect(intervals, start, end):
+    """Portions of intervals within [start, end]."""
+    return [
+        [max(start, interval_start), min(end, interval_end)]
+        for interval_start, interval_end in intervals
+        if interval_start <= end and interval_end >= start
+    ]
+
+
+def intervals_subtract(start, end, intervals):
+    """Portions of [start, end] not within intervals."""
+    missing = []
+    for interval_start, interval_end in intervals_merge(intervals_intersect(intervals, start, end)):
+        if interval_start > start:
+            missing.append([start, interval_start - 1])
+        start = interval_end + 1
+    if start <= end:
+        missing.append([start, end])
+    return missing
+
+
+class LocalDiskCache(object):
+    """Local persistent cache tier: one compressed binary file per cache key,
+        stored under '<cache_dir>/<cache_group_name>/<key[:2]>/<key>'.
+
+        Binary values (bytes) are stored as is, being already encoded by
+        stock_investing.codec; any other value is stored as compressed pickle.
+    """
+    _COMPRESS_LEVEL = 1
+
+    _FORMAT_BYTES = b"\x00"
+    _FORMAT_PICKLE = b"\x01"
+
+    def __init__(self, cache_dir):
+        assert cache_dir
+        self.cache_dir = cache_dir
+
+    def path(self, cache_key, cache_group_name):
+        return os.path.join(self.cache_dir, cache_group_name, cache_key[:2], cache_key)
+
+    def get(self, cache_key, cache_group_name='default'):
+        try:
+            with open(self.path(cache_key, cache_group_name), "rb") as cache_file:
+                return self.deserialize(cache_file.read())
+        except FileNotFoundError:
+            return None
+
+    def put(self, cache_key, cache_value, cache_group_name='default'):
+        """Write value atomically: temporary file within same directory, then rename."""
+        cache_path = self.path(cache_key, cache_group_name)
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as cache_file:
+                cache_file.write(self.serialize(cache_value))
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def delete(self, cache_key, cache_group_name='default'):
+        try:
+            os.unlink(self.path(cache_key, cache_group_name))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def serialize(self, cache_value):
+        if isinstance(cache_value, bytes):
+            return self._FORMAT_BYTES + cache_value
+        return self._FORMAT_PICKLE + zlib.compress(
+            pickle.dumps(cache_value, protocol=pickle.HIGHEST_PROTOCOL), self._COMPRESS_LEVEL
+        )
+
+    def deserialize(self, cache_bytes):
+        cache_format, cache_bytes = cache_bytes[:1], cache_bytes[1:]
+        if cache_format == self._FORMAT_BYTES:
+            return cache_bytes
+        if cache_format == self._FORMAT_PICKLE:
+            return pickle.loads(zlib.decompress(cache_bytes))
+        # Unprefixed compressed pickle, as written by earlier releases
+        return pickle.loads(zlib.decompress(cache_format + cache_bytes))
+
+
+class StockInvestorCache(object):
+    """Two-tier cache: local on-disk tier consulted before memcached, with
+        write-through on put. Historical WIKI data is immutable, so a warm local
+        tier serves repeat runs without any memcached or network calls.
+
+        Binary values (bytes) bypass CacheClient JSON serialization, and are
+        stored into memcached as is with the raw client.
+    """
+    _GET_MULTI_BATCH_SIZE = 100
+    _REMOTE_EXPIRES_IN = SECONDS_FOR_30_MINUTES
+
+    @property
+    def local_cache(self):
+        return self.__local_cache
+
+    @property
+    def remote_cache(self):
+        return self.__remote_cache
+
+    def __init__(self, cache_name, cache_dir=CACHE_DIR_DEFAULT, logger=None):
+        """Initialize
+
+        :param cache_name: memcached CacheClient name
+        :param cache_dir: Local tier directory, None disables local tier.
+        :param logger:
+        """
+        self.logger = logger or log
+        self.__local_cache = LocalDiskCache(cache_dir) if cache_dir else None
+        self.__remote_cache = CacheClient(cache_name=cache_name)
+
+    def get(self, cache_key=None, request_params=None, request_url=None, cache_group_name='default', binary=False):
+        """Get cache value, local tier first.
+
+        :param binary: Cache value is bytes, as put.
+        :return: (cache value or None, cache key)
+        """
+        if cache_key is None:
+            cache_key = create_cache_key(
+                request_params=request_params,
+                request_url=request_url,
+                cache_group_name=cache_group_name,
+                client_unique_hash=None
+            )
+
+        if self.local_cache:
+            cache_value = self.local_cache.get(cache_key, cache_group_name)
+            if cache_value is not None:
+                return cache_value, cache_key
+
+        try:
+            if binary:
+                cache_value = self.remote_cache.external_cache.cache_client.get(cache_key)
+            else:
+                cache_value, _ = self.remote_cache.get(cache_key=cache_key, cache_group_name=cache_group_name)
+        except Exception as ex:
+            self.logger.warning(
+                "Cache: Remote: GET: Failed",
+                extra={'cache_key': cache_key, 'error': get_exception_message(ex)}
+            )
+            return None, cache_key
+
+        if cache_value is not None and self.local_cache:
+            # Warm local tier from memcached
+            self.local_cache.put(cache_key, cache_value, cache_group_name)
+
+        return cache_value, cache_key
+
+    def get_multi(self, cache_keys, cache_group_name='default', binary=False):
+        """Bulk cache probe: local tier first, then memcached multi-get in batches
+        of _GET_MULTI_BATCH_SIZE keys.
+
+        :param cache_keys: list of cache keys
+        :param cache_group_name:
+        :param binary: Cache values are bytes, as put.
+        :return: dict: cache key to cache value, only for keys found.
+        """
+        found = {}
+        missing = []
+        for cache_key in cache_keys:
+            cache_value = self.local_cache.get(cache_key, cache_group_name) if self.local_cache else None
+            if cache_value is not None:
+                found[cache_key] = cache_value
+            else:
+                missing.append(cache_key)
+
+        external_cache = self.remote_cache.external_cache
+        if not missing or external_cache.cache_client is None:
+            return found
+
+        for index in range(0, len(missing), self._GET_MULTI_BATCH_SIZE):
+            batch = missing[index:index + self._GET_MULTI_BATCH_SIZE]
+            try:
+                batch_values = external_cache.cache_client.get_many(batch)
+            except Exception as ex:
+                self.logger.warning(
+                    "Cache: Remote: GET MULTI: Failed",
+                    extra={'cache_keys': len(batch), 'error': get_exception_message(ex)}
+                )
+                return found
+
+            for cache_key, cache_value in batch_values.items():
+                if isinstance(cache_key, bytes):
+                    cache_key = cache_key.decode("utf-8")
+                if not binary:
+                    cache_value = external_cache.cache_value_deserialize(cache_value)
+                found[cache_key] = cache_value
+
+                if self.local_cache:
+                    # Warm local tier from memcached
+                    self.local_cache.put(cache_key, cache_value, cache_group_name)
+
+        return found
+
+    def put(self, cache_key, cache_value, cache_group_name='default'):
+        """Write-through: local tier, then memcached."""
+        if self.local_cache:
+            self.local_cache.put(cache_key, cache_value, cache_group_name)
+
+        try:
+            if isinstance(cache_value, bytes):
+                self.remote_cache.external_cache.cache_client.set(
+                    cache_key, cache_value, expire=self._REMOTE_EXPIRES_IN
+                )
+            else:
+                self.remote_cache.put(cache_key=cache_key, cache_value=cache_value, cache_group_name=cache_group_name)
+        except Exception as ex:
+            self.logger.warning(
+                "Cache: Remote: PUT: Failed",
+                extra={'cache_key': cache_key, 'error': get_exception_message(ex)}
+            )
+
+
+class StockInvestorCacheIndex(object):
+    """Range-aware cache index: per symbol, the merged intervals of calendar days
+        whose trading days are held within cached symbol-month entries.
+
+        Any requested range is then served by slicing cached months, and only
+        the genuinely missing intervals are fetched.
+
+        Days fetched with every column are indexed per symbol; days fetched for
+        a single column (request-level column projection) are indexed per
+        symbol and column, a column being covered by both.
+    """
+    CACHE_GROUP_NAME = "index"
+
+    def __init__(self, cache):
+        """Initialize
+
+        :param cache: StockInvestorCache
+        """
+        self.cache = cache
+        self.__intervals = {}
+
+    def cache_key(self, stock, column=None):
+        if column is None:
+            return stock_cache_key(stock, self.CACHE_GROUP_NAME)
+        return stock_column_cache_key(stock, column, self.CACHE_GROUP_NAME)
+
+    def get(self, stock, column=None):
+        """Covered intervals of stock, of column if provided."""
+        if (stock, column) not in self.__intervals:
+            intervals, _ = self.cache.get(
+                cache_key=self.cache_key(stock, column),
+                cache_group_name=self.CACHE_GROUP_NAME
+            )
+            self.__intervals[(stock, column)] = intervals_merge(intervals or [])
+
+        if column is None:
+            return self.__intervals[(stock, None)]
+        return intervals_merge(self.get(stock) + self.__intervals[(stock, column)])
+
+    def get_columns(self, stock, columns):
+        """Covered intervals of stock where every one of columns is covered."""
+        covered = self.get(stock, columns[0])
+        for column in columns[1:]:
+            column_intervals = self.get(stock, column)
+            covered = [
+                interval for start, end in covered for interval in intervals_intersect(column_intervals, start, end)
+            ]
+        return intervals_merge(covered)
+
+    def prefetch(self, stocks, columns=None):
+        """Load index of several stocks, and of their columns if provided, with a single bulk cache probe."""
+        keys = [
+            (stock, column) for stock in stocks for column in [None] + list(columns or [])
+            if (stock, column) not in self.__intervals
+        ]
+        found = self.cache.get_multi(
+            [self.cache_key(stock, column) for stock, column in keys],
+            cache_group_name=self.CACHE_GROUP_NAME
+        )
+        for stock, column in keys:
+            intervals = found.get(self.cache_key(stock, column))
+            self.__intervals[(stock, column)] = intervals_merge(intervals or [])
+
+    def add(self, stock, start, end, column=None):
+        """Record [start, end] as cached, of column if provided, and persist stock index."""
+        self.get(stock, column)
+        self.__intervals[(stock, column)] = intervals_merge(self.__intervals[(stock, column)] + [[start, end]])
+        self.cache.put(
+            cache_key=self.cache_key(stock, column),
+            cache_value=self.__intervals[(stock, column)],
+            cache_group_name=self.CACHE_GROUP_NAME
+        )
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace stock_investing
+
+import struct
+import zlib
+
+import numpy as np
+
+from stock_investing.price_store import COLUMN_DATE
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+#
+# Compact cache codec for symbol-month slices.
+#
+# Header:  magic 'SIPC' | version u8 | compression u8 | rows u32 | columns u16
+# Columns: name length u8 | name utf-8 | type code u8, for each column
+# Payload: fixed-width packed little-endian column arrays, optionally compressed
+#
+CODEC_MAGIC = b"SIPC"
+CODEC_VERSION = 1
+
+_HEADER = struct.Struct("<4sBBIH")
+
+
+class CodecCompression(object):
+    """ENUM
+    """
+    NONE = 0
+    ZLIB = 1
+    ZSTD = 2
+    LZ4 = 3
+
+    @staticmethod
+    def default():
+        if zstandard is not None:
+            return CodecCompression.ZSTD
+        if lz4_frame is not None:
+            return CodecCompression.LZ4
+        return CodecCompression.ZLIB
+
+
+class CodecType(object):
+    """ENUM: Packed column types
+    """
+    DAYS_INT32 = ord("D")  # Date: int32 days since epoch
+    UINT64 = ord("Q")  # Integral non-negative values, e.g. Volume
+    FLOAT32 = ord("f")  # Values exactly representable as float32
+    FLOAT64 = ord("d")
+
+    DTYPES = {
+        DAYS_INT32: np.dtype("<i4"),
+        UINT64: np.dtype("<u8"),
+        FLOAT32: np.dtype("<f4"),
+        FLOAT64: np.dtype("<f8"),
+    }
+
+
+class CodecError(ValueError):
+    pass
+
+
+def _column_type(column, values):
+    """Narrowest lossless packed type of a column."""
+    if column == COLUMN_DATE:
+        return CodecType.DAYS_INT32
+
+    finite = np.isfinite(values)
+    if finite.all() and (values >= 0).all() and (values == np.floor(values)).all():
+        return CodecType.UINT64
+
+    as_float32 = values.astype(np.float32).astype(np.float64)
+    if ((as_float32 == values) | ~finite).all():
+        return CodecType.FLOAT32
+
+    return CodecType.FLOAT64
+
+
+def _compress(payload, compression):
+    if compression == CodecCompression.ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(payload)
+    if compression == CodecCompression.LZ4:
+        return lz4_frame.compress(payload)
+    if compression == CodecCompression.ZLIB:
+        return zlib.compress(payload, 6)
+    return payload
+
+
+def _decompress(payload, compression):
+    if compression == CodecCompression.ZSTD:
+        if zstandard is None:
+            raise CodecError("Codec: zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if compression == CodecCompression.LZ4:
+        if lz4_frame is None:
+            raise CodecError("Codec: lz4 is not installed")
+        return lz4_frame.decompress(payload)
+    if compression == CodecCompression.ZLIB:
+        return zlib.decompress(payload)
+    if compression == CodecCompression.NONE:
+        return payload
+    raise CodecError("Codec: Unknown compression: {}".format(compression))
+
+
+def encode(columns, arrays, compression=None):
+    """Encode column arrays of a symbol-month slice.
+
+    :param columns: list: column names, ordered
+    :param arrays: dict: column name to array, Date as int64 days since epoch
+    :param compression: CodecCompression, default: best available
+    :return: bytes
+    """
+    if compression is None:
+        compression = CodecCompression.default()
+
+    rows = len(arrays[COLUMN_DATE])
+
+    header = [_HEADER.pack(CODEC_MAGIC, CODEC_VERSION, compression, rows, len(columns))]
+    payload = []
+    for column in columns:
+        values = np.asarray(arrays[column])
+        if column != COLUMN_DATE:
+            values = values.astype(np.float64, copy=False)
+
+        column_type = _column_type(column, values)
+        name = column.encode("utf-8")
+
+        header.append(struct.pack("<B", len(name)) + name + struct.pack("<B", column_type))
+        payload.append(values.astype(CodecType.DTYPES[column_type]).tobytes())
+
+    return b"".join(header) + _compress(b"".join(payload), compression)
+
+
+def decode(cache_bytes):
+    """Decode a symbol-month slice.
+
+    :param cache_bytes: bytes
+    :return: (columns, arrays): Date as int64 days since epoch, other columns as float64
+    """
+    if len(cache_bytes) < _HEADER.size:
+        raise CodecError("Codec: Truncated header")
+
+    magic, version, compression, rows, count = _HEADER.unpack_from(cache_bytes, 0)
+    if magic != CODEC_MAGIC:
+        raise CodecError("Codec: Invalid magic")
+    if version != CODEC_VERSION:
+        raise CodecError("Codec: Unsupported version: {}".format(version))
+
+    offset = _HEADER.size
+    columns = []
+    column_types = []
+    for _ in range(count):
+        name_length = cache_bytes[offset]
+        offset += 1
+        columns.append(cache_bytes[offset:offset + name_length].decode("utf-8"))
+        offset += name_length
+        column_types.append(cache_bytes[offset])
+        offset += 1
+
+    payload = _decompress(cache_bytes[offset:], compression)
+
+    arrays = {}
+    position = 0
+    for column, column_type in zip(columns, column_types):
+        dtype = CodecType.DTYPES[column_type]
+        values = np.frombuffer(payload, dtype=dtype, count=rows, offset=position)
+        position += rows * dtype.itemsize
+        arrays[column] = values.astype(np.int64 if column == COLUMN_DATE else np.float64)
+
+    return columns, arrays
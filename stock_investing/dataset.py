@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace stock_investing
+
+import os
+import json
+import shutil
+import tempfile
+import logging
+
+import numpy as np
+
+from stock_investing.cache import (intervals_merge, intervals_subtract)
+from stock_investing.price_store import (StockPriceStore, COLUMN_DATE, EPOCH_ORDINAL, column_dtype)
+
+log = logging.getLogger(__name__)
+
+DATASET_VERSION = 1
+
+
+class StockInvestorDataset(object):
+    """Persistent columnar dataset of the symbol universe.
+
+        One memory-mapped .npy file per column, rows ordered by symbol then
+        Date, plus 'index.json' holding per symbol its offset, length and the
+        intervals of days covered. Opening maps the column files without
+        reading them; per symbol/date range slices are zero-copy views, so only
+        the pages actually analyzed become resident.
+    """
+    _INDEX_FILE = "index.json"
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def columns(self):
+        return list(self.__columns)
+
+    @property
+    def symbols(self):
+        return list(self.__symbols)
+
+    def __init__(self, path, columns, arrays, symbols):
+        """Initialize, see open()
+
+        :param path: Dataset directory
+        :param columns: list: column names
+        :param arrays: dict: column name to memory-mapped array
+        :param symbols: dict: stock to {'offset', 'length', 'intervals'}
+        """
+        self.__path = path
+        self.__columns = columns
+        self.__arrays = arrays
+        self.__symbols = symbols
+
+    @classmethod
+    def open(cls, path):
+        """Map dataset at path.
+
+        :return: StockInvestorDataset, or None if there is no dataset at path.
+        """
+        try:
+            with open(os.path.join(path, cls._INDEX_FILE), "r") as index_file:
+                index = json.load(index_file)
+        except FileNotFoundError:
+            return None
+
+        if index.get("version") != DATASET_VERSION:
+            log.warning("Dataset: Unsupported version", extra={'path': path, 'version': index.get("version")})
+            return None
+
+        arrays = {
+            column: np.load(os.path.join(path, cls.column_file(column)), mmap_mode="r")
+            for column in index["columns"]
+        }
+        return cls(path, index["columns"], arrays, index["symbols"])
+
+    @staticmethod
+    def column_file(column):
+        return "{}.npy".format(column.replace("/", "_"))
+
+    def covers(self, stock, start, end):
+        """Whether [start, end] date ordinals of stock are within dataset."""
+        symbol = self.__symbols.get(stock)
+        return symbol is not None and not intervals_subtract(start, end, symbol["intervals"])
+
+    def slice(self, stock, start=None, end=None):
+        """Zero-copy views of stock rows within [start, end] date ordinals.
+
+        :return: dict: column name to array view, empty if stock is not within dataset.
+        """
+        symbol = self.__symbols.get(stock)
+        if symbol is None:
+            return {}
+
+        offset, length = symbol["offset"], symbol["length"]
+        days = self.__arrays[COLUMN_DATE][offset:offset + length]
+
+        first = 0 if start is None else int(np.searchsorted(days, start - EPOCH_ORDINAL, side="left"))
+        last = length if end is None else int(np.searchsorted(days, end - EPOCH_ORDINAL, side="right"))
+
+        return {column: array[offset + first:offset + last] for column, array in self.__arrays.items()}
+
+    def slices(self, stocks, start=None, end=None):
+        """Zero-copy views of several stocks, see slice()."""
+        return {stock: self.slice(stock, start, end) for stock in stocks}
+
+    @classmethod
+    def write(cls, path, stocks_data, stocks_intervals, dataset=None):
+        """Write dataset at path, merging stocks data into rows of an existing
+        dataset. Written within a temporary directory then swapped into place,
+        so that concurrent readers keep their mapping of the previous dataset.
+
+        :param path: Dataset directory
+        :param stocks_data: dict: stock to StockPriceStore
+        :param stocks_intervals: dict: stock to intervals of date ordinals covered by its data
+        :param dataset: StockInvestorDataset: existing dataset, rows kept for stocks not updated.
+        :return: StockInvestorDataset, opened
+        """
+        stores = {}
+        symbols_intervals = {}
+        for stock in (dataset.symbols if dataset else []):
+            symbols_intervals[stock] = dataset.__symbols[stock]["intervals"]
+
+        for stock, stock_data in stocks_data.items():
+            store = StockPriceStore(stock_data.columns)
+            if dataset and stock in dataset.__symbols:
+                # Fetched rows appended last, so that they are kept upon duplicated dates.
+                store.append_arrays(dataset.slice(stock))
+            if len(stock_data):
+                store.append_arrays(stock_data.to_dict())
+            store.sort()
+            stores[stock] = store
+            symbols_intervals[stock] = intervals_merge(
+                symbols_intervals.get(stock, []) + stocks_intervals.get(stock, [])
+            )
+
+        columns = list(dataset.columns) if dataset else []
+        for store in stores.values():
+            columns += [column for column in store.columns if column not in columns]
+
+        symbols = {}
+        offset = 0
+        for stock in sorted(symbols_intervals):
+            length = len(stores[stock]) if stock in stores else dataset.__symbols[stock]["length"]
+            symbols[stock] = {"offset": offset, "length": length, "intervals": symbols_intervals[stock]}
+            offset += length
+
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=parent, prefix=".tmp-dataset-")
+        try:
+            # One column at a time, so resident memory is bounded by a column's pages.
+            for column in columns:
+                array = np.lib.format.open_memmap(
+                    os.path.join(tmp_path, cls.column_file(column)),
+                    mode="w+", dtype=column_dtype(column), shape=(offset,)
+                )
+                for stock, symbol in symbols.items():
+                    rows = slice(symbol["offset"], symbol["offset"] + symbol["length"])
+                    source = stores[stock].to_dict() if stock in stores else dataset.slice(stock)
+                    if column in source:
+                        array[rows] = source[column]
+                    else:
+                        array[rows] = 0 if np.issubdtype(array.dtype, np.integer) else np.nan
+                array.flush()
+                del array
+
+            with open(os.path.join(tmp_path, cls._INDEX_FILE), "w") as index_file:
+                json.dump(
+                    {"version": DATASET_VERSION, "columns": columns, "rows": offset, "symbols": symbols}, index_file
+                )
+
+            if os.path.isdir(path):
+                old_path = tempfile.mkdtemp(dir=parent, prefix=".old-dataset-")
+                os.rename(path, os.path.join(old_path, "dataset"))
+                os.rename(tmp_path, path)
+                shutil.rmtree(old_path, ignore_errors=True)
+            else:
+                os.rename(tmp_path, path)
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        return cls.open(path)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace stock_investing
+
+import os
+import json
+import logging
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as pa_dataset
+import pyarrow.parquet as pq
+
+from stock_investing.analytics import tasks_columns
+from stock_investing.cache import (intervals_merge, intervals_subtract, ordinal_to_date)
+
+log = logging.getLogger(__name__)
+
+
+def task_columns(tasks):
+    """Columns needed to compute tasks, in first-needed order."""
+    return ["Stock", "Date"] + tasks_columns(tasks)
+
+
+class StockInvestorParquet(object):
+    """Parquet dataset of the assembled price table, hive-partitioned by
+        'Stock=<symbol>/Year=<year>', so that reads prune partitions on Stock and
+        Date and load only the columns needed by the requested tasks.
+
+        Days covered per stock are recorded alongside partitions, so that a read
+        reports the days of its range that were never written.
+    """
+    _COVERAGE_FILE = "_coverage.json"
+
+    PARTITIONING = pa_dataset.partitioning(
+        pa.schema([("Stock", pa.string()), ("Year", pa.int32())]), flavor="hive"
+    )
+
+    def __init__(self, path, logger=None):
+        """Initialize
+
+        :param path: Parquet dataset directory
+        :param logger:
+        """
+        assert path
+        self.path = path
+        self.logger = logger or log
+
+    def write(self, df, stocks_intervals=None):
+        """Write assembled price table, merged into partitions of its stocks and years: its rows replace
+        those of the same Stock and Date, other rows written before are kept.
+
+        :param df: DataFrame: Stock, Date and price columns
+        :param stocks_intervals: dict: stock to intervals of date ordinals covered by df, added to coverage.
+        """
+        df = df.assign(Stock=df["Stock"].astype(str), Year=df["Date"].dt.year.astype("int32"))
+
+        written = self.read_partitions(df)
+        if len(written):
+            # Rows of df last, so that they are kept upon duplicated dates.
+            df = pd.concat([written, df], ignore_index=True, sort=False)
+            df = df.drop_duplicates(["Stock", "Date"], keep="last")
+            df = df.sort_values(["Stock", "Date"], kind="stable", ignore_index=True)
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        pq.write_to_dataset(
+            table,
+            self.path,
+            partitioning=self.PARTITIONING,
+            existing_data_behavior="delete_matching",
+        )
+        if stocks_intervals:
+            coverage = self.coverage() or {}
+            for stock, intervals in stocks_intervals.items():
+                coverage[stock] = intervals_merge(coverage.get(stock, []) + intervals)
+            with open(os.path.join(self.path, self._COVERAGE_FILE), "w") as coverage_file:
+                json.dump(coverage, coverage_file)
+
+        self.logger.debug("Parquet: Write", extra={'path': self.path, 'rows': len(df)})
+
+    def read_partitions(self, df):
+        """Rows written within partitions of the stocks and years of df.
+
+        :param df: DataFrame: Stock (str) and Year columns
+        :return: DataFrame: Stock, Date, Year and price columns
+        """
+        if not len(df) or not os.path.isdir(self.path):
+            return pd.DataFrame()
+
+        partitions = df[["Stock", "Year"]].drop_duplicates()
+        table = pq.read_table(
+            self.path,
+            partitioning=self.PARTITIONING,
+            filters=[
+                ("Stock", "in", partitions["Stock"].unique().tolist()),
+                ("Year", "in", partitions["Year"].unique().tolist()),
+            ],
+        )
+
+        written = table.to_pandas()
+        written = written.assign(Stock=written["Stock"].astype(str), Year=written["Year"].astype("int32"))
+        return written.merge(partitions, on=["Stock", "Year"])
+
+    def coverage(self):
+        """Days covered per stock, None if not recorded (dataset written without coverage).
+
+        :return: dict: stock to intervals of date ordinals
+        """
+        coverage_path = os.path.join(self.path, self._COVERAGE_FILE)
+        if not os.path.exists(coverage_path):
+            return None
+        with open(coverage_path) as coverage_file:
+            return json.load(coverage_file)
+
+    def missing(self, stocks, start_datetime, end_datetime):
+        """Days of stocks within date range not covered by dataset.
+
+        :return: dict: stock to intervals of date ordinals not covered, stocks fully covered omitted;
+            None if coverage is not recorded.
+        """
+        coverage = self.coverage()
+        if coverage is None:
+            return None
+
+        start, end = start_datetime.toordinal(), end_datetime.toordinal()
+        missing = {stock: intervals_subtract(start, end, coverage.get(stock, [])) for stock in stocks}
+        return {stock: intervals for stock, intervals in missing.items() if intervals}
+
+    def read(self, stocks, start_datetime, end_datetime, tasks):
+        """Read price table of stocks within date range, projected on columns needed by tasks.
+
+        :param stocks: list: stock symbols, ordering rows
+        :param start_datetime:
+        :param end_datetime:
+        :param tasks: list of StockInvestorTask
+        :return: DataFrame: Stock (categorical on stocks), Date and task columns, ordered by Stock then Date.
+        """
+        start = pd.Timestamp(start_datetime.date())
+        end = pd.Timestamp(end_datetime.date())
+
+        table = pq.read_table(
+            self.path,
+            columns=task_columns(tasks),
+            partitioning=self.PARTITIONING,
+            filters=[
+                ("Stock", "in", list(stocks)),
+                ("Year", ">=", start.year),
+                ("Year", "<=", end.year),
+                ("Date", ">=", start),
+                ("Date", "<=", end),
+            ],
+        )
+
+        df = table.to_pandas()
+        df["Stock"] = pd.Categorical(df["Stock"].astype(str), categories=stocks)
+        df = df.sort_values(["Stock", "Date"], kind="stable", ignore_index=True)
+
+        missing = self.missing(stocks, start_datetime, end_datetime)
+        if missing is None:
+            self.logger.warning("Parquet: Read: Coverage not recorded", extra={'path': self.path})
+        elif missing:
+            self.logger.warning("Parquet: Read: Incomplete", extra={
+                'path': self.path,
+                'missing': {
+                    stock: [[ordinal_to_date(start), ordinal_to_date(end)] for start, end in intervals]
+                    for stock, intervals in missing.items()
+                }
+            })
+
+        self.logger.debug("Parquet: Read", extra={'path': self.path, 'rows': len(df)})
+        return df
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace stock_investing
+
+import numpy as np
+
+COLUMN_DATE = "Date"
+
+# datetime.date(1970, 1, 1).toordinal(): date ordinal of day 0 since epoch
+EPOCH_ORDINAL = 719163
+
+# WIKI dataset columns; Date is stored as int64 days since epoch,
+# any other column not listed here is stored as float64.
+WIKI_COLUMN_DTYPES = {
+    "Date": np.int64,
+    "Open": np.float64,
+    "High": np.float64,
+    "Low": np.float64,
+    "Close": np.float64,
+    "Volume": np.float64,
+    "Ex-Dividend": np.float64,
+    "Split Ratio": np.float64,
+    "Adj. Open": np.float64,
+    "Adj. High": np.float64,
+    "Adj. Low": np.float64,
+    "Adj. Close": np.float64,
+    "Adj. Volume": np.float64,
+}
+
+
+def column_dtype(column):
+    return WIKI_COLUMN_DTYPES.get(column, np.float64)
+
+
+def column_index(column):
+    """Index of a WIKI dataset column, as WIKI API 'column_index' parameter."""
+    return list(WIKI_COLUMN_DTYPES).index(column)
+
+
+def dates_to_days(dates):
+    """Convert 'YYYY-MM-DD' strings into int64 days since epoch."""
+    return np.array(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def days_to_dates(days):
+    """Convert int64 days since epoch into 'YYYY-MM-DD' strings."""
+    return np.asarray(days).astype("datetime64[D]").astype(str)
+
+
+class StockPriceStore(object):
+    """Columnar per-symbol price container.
+
+        One contiguous NumPy array per column, grown by doubling capacity, so a
+        row costs 8 bytes per column (~104 bytes for the 13 WIKI columns)
+        instead of a list of boxed Python objects. Volumes are kept as float64
+        so that missing values (null) remain NaN.
+    """
+    _INITIAL_CAPACITY = 256
+
+    def __init__(self, columns=None):
+        self.__columns = []
+        self.__arrays = {}
+        self.__size = 0
+        self.__capacity = 0
+
+        for column in (columns or []):
+            self._add_column(column)
+
+    @property
+    def columns(self):
+        return list(self.__columns)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.__arrays.values())
+
+    def __len__(self):
+        return self.__size
+
+    def column(self, column):
+        """Contiguous view of a column, trimmed to current size."""
+        return self.__arrays[column][:self.__size]
+
+    @property
+    def days(self):
+        return self.column(COLUMN_DATE)
+
+    @property
+    def dates(self):
+        return self.days.astype("datetime64[D]")
+
+    def _add_column(self, column):
+        if column in self.__arrays:
+            return
+
+        dtype = column_dtype(column)
+        array = np.empty(self.__capacity, dtype=dtype)
+        if self.__size:
+            array[:self.__size] = 0 if np.issubdtype(dtype, np.integer) else np.nan
+
+        self.__columns.append(column)
+        self.__arrays[column] = array
+
+    def _reserve(self, size):
+        if size <= self.__capacity:
+            return
+
+        capacity = max(self._INITIAL_CAPACITY, self.__capacity)
+        while capacity < size:
+            capacity *= 2
+
+        for column, array in self.__arrays.items():
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self.__size] = array[:self.__size]
+            self.__arrays[column] = grown
+
+        self.__capacity = capacity
+
+    def append(self, columns, data):
+        """Append rows as parsed from WIKI JSON 'dataset_data'.
+
+        :param columns: list: 'column_names'
+        :param data: list of rows: 'data'
+        """
+        if not data:
+            for column in columns:
+                self._add_column(column)
+            return
+
+        self.append_arrays(self.rows_arrays(columns, data))
+
+    @staticmethod
+    def rows_arrays(columns, data):
+        """Column arrays of rows as parsed from WIKI JSON 'dataset_data'."""
+        arrays = {}
+        for index, column in enumerate(columns):
+            values = [row[index] for row in data]
+            if column == COLUMN_DATE:
+                arrays[column] = dates_to_days(values)
+            else:
+                arrays[column] = np.array(values, dtype=column_dtype(column))
+
+        return arrays
+
+    def append_arrays(self, arrays):
+        """Append column arrays of equal length, Date as int64 days since epoch.
+
+        :param arrays: dict: column name to array
+        """
+        assert COLUMN_DATE in arrays
+
+        for column in arrays:
+            self._add_column(column)
+
+        count = len(arrays[COLUMN_DATE])
+        start, end = self.__size, self.__size + count
+        self._reserve(end)
+
+        for column, array in self.__arrays.items():
+            if column in arrays:
+                array[start:end] = arrays[column]
+            else:
+                array[start:end] = 0 if np.issubdtype(array.dtype, np.integer) else np.nan
+
+        self.__size = end
+
+    def update(self, columns, data):
+        """Merge rows as parsed from WIKI JSON 'dataset_data', see update_arrays()."""
+        if not data:
+            for column in columns:
+                self._add_column(column)
+            return
+
+        self.update_arrays(self.rows_arrays(columns, data))
+
+    def update_arrays(self, arrays):
+        """Merge column arrays by Date: values of their columns replace those of
+        rows of the same Date, other columns are kept; rows of new dates are
+        added, their other columns missing. Rows end up ordered by Date.
+
+        Used for column-projected data, fetched one column at a time.
+
+        :param arrays: dict: column name to array, Date as int64 days since epoch
+        """
+        assert COLUMN_DATE in arrays
+
+        self.sort()
+        for column in arrays:
+            self._add_column(column)
+
+        days = np.asarray(arrays[COLUMN_DATE])
+        merged_days = np.union1d(self.days, days)
+        own_rows = np.searchsorted(merged_days, self.days)
+        new_rows = np.searchsorted(merged_days, days)
+
+        merged = {}
+        for column, array in self.__arrays.items():
+            merged_array = np.empty(len(merged_days), dtype=array.dtype)
+            merged_array[:] = 0 if np.issubdtype(array.dtype, np.integer) else np.nan
+            merged_array[own_rows] = array[:self.__size]
+            if column in arrays:
+                merged_array[new_rows] = arrays[column]
+            merged[column] = merged_array
+
+        self.__arrays = merged
+        self.__size = self.__capacity = len(merged_days)
+
+    def sort(self):
+        """Order rows by Date, keeping the last appended row of any duplicated Date."""
+        if not self.__size:
+            return
+
+        days = self.days
+        order = np.argsort(days, kind="stable")
+        sorted_days = days[order]
+
+        # Keep last occurrence of each day
+        keep = np.ones(len(order), dtype=bool)
+        keep[:-1] = sorted_days[1:] != sorted_days[:-1]
+        order = order[keep]
+
+        for column, array in self.__arrays.items():
+            array[:len(order)] = array[:self.__size][order]
+
+        self.__size = len(order)
+
+    def to_dict(self):
+        """Column name to contiguous array view."""
+        return {column: self.column(column) for column in self.__columns}
+
+    def rows(self):
+        """Rows in WIKI JSON layout, Date as 'YYYY-MM-DD'."""
+        arrays = [
+            days_to_dates(self.column(column)).tolist() if column == COLUMN_DATE else self.column(column).tolist()
+            for column in self.__columns
+        ]
+        return [list(row) for row in zip(*arrays)]
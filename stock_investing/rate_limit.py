@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace stock_investing
+
+import time
+import logging
+import threading
+import datetime as dt
+from email.utils import parsedate_to_datetime
+
+from pyhttpstatus_utils import HttpStatusCode
+
+log = logging.getLogger(__name__)
+
+
+class RateLimitQuotaExceeded(Exception):
+    """Daily quota of requests is used up."""
+    pass
+
+
+def retry_after_seconds(value):
+    """Seconds to wait from a Retry-After header value, either seconds or an HTTP-date.
+
+    :param value: str: Retry-After header value, possibly None
+    :return: float: seconds, None if absent or not parsable.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_datetime = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_datetime.tzinfo is None:
+        retry_datetime = retry_datetime.replace(tzinfo=dt.timezone.utc)
+
+    return max(0.0, (retry_datetime - dt.datetime.now(dt.timezone.utc)).total_seconds())
+
+
+class StockInvestorRateLimiter(object):
+    """Token bucket shared by all fetching workers, which reserve a token
+        before each request and report each response.
+
+        The rate adapts AIMD-wise: it grows by _RATE_INCREASE requests per
+        second every second of successful responses, and is halved upon a throttled
+        (TOO_MANY_REQUESTS) response, at most once per hold period, as in-flight
+        requests issued at the former rate are throttled alike. A Retry-After
+        pauses all workers until then. Reservations beyond the tokens available
+        are queued as debt, so that waiting workers are released one every
+        1 / rate seconds rather than all at once.
+
+        A daily quota bounds the number of requests per UTC day: every request
+        is counted upon reserve(), and workers check it with quota_check()
+        before issuing one, so it is exceeded at most by requests in flight.
+    """
+    _RATE = 20.0
+    _RATE_MIN = 0.5
+    _RATE_MAX = 50.0
+    _RATE_INCREASE = 1.0
+    _RATE_DECREASE = 0.5
+    _DECREASE_HOLD_SECS = 1.0
+
+    @property
+    def rate(self):
+        return self.__rate
+
+    @property
+    def quota_used(self):
+        return self.__quota_used
+    @quota_used.setter
+    def quota_used(self, value):
+        with self.__lock:
+            self.__quota_used = value
+
+    def __init__(self, rate=None, burst=None, rate_max=None, daily_quota=None, quota_used=0, logger=None):
+        """Initialize
+
+        :param rate: Initial requests per second
+        :param burst: Bucket capacity, requests issued at once after idling, default: 1 second of rate.
+        :param rate_max: Highest requests per second the rate grows to
+        :param daily_quota: Requests per UTC day, None for unlimited.
+        :param quota_used: Requests already issued today, e.g. by previous runs.
+        :param logger:
+        """
+        self.logger = logger or log
+        self.__lock = threading.Lock()
+
+        self.__rate = float(rate or self._RATE)
+        self.__rate_max = float(max(rate_max or self._RATE_MAX, self.__rate))
+        self.__burst = float(burst or max(1.0, self.__rate))
+        self.__tokens = self.__burst
+        self.__updated = time.monotonic()
+        self.__decreased = 0.0
+
+        self.daily_quota = daily_quota
+        self.__quota_day = self.today()
+        self.__quota_used = quota_used
+
+    @staticmethod
+    def today():
+        return dt.datetime.now(dt.timezone.utc).date()
+
+    def quota_check(self):
+        """Raise RateLimitQuotaExceeded if daily quota is used up."""
+        with self.__lock:
+            self.__quota_check()
+
+    def reserve(self):
+        """Take a token, counted against daily quota.
+
+        :return: float: seconds to wait before issuing the request.
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__refill(now)
+            self.__quota_day_roll()
+            self.__quota_used += 1
+
+            self.__tokens -= 1.0
+            return max(0.0, self.__updated - now) + max(0.0, -self.__tokens) / self.__rate
+
+    def acquire(self):
+        """Wait for a token; for threads."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait for a token; for an event loop."""
+        import asyncio
+
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def update(self, status_code, headers=None):
+        """Adapt rate to a response.
+
+        :param status_code: HTTP status code
+        :param headers: Response headers, for Retry-After
+        """
+        if status_code == HttpStatusCode.TOO_MANY_REQUESTS:
+            self.throttled(retry_after_seconds((headers or {}).get("Retry-After")))
+        elif status_code < 500:
+            self.succeeded()
+
+    def succeeded(self):
+        """Additive increase: _RATE_INCREASE requests per second per second of responses."""
+        with self.__lock:
+            self.__rate = min(self.__rate_max, self.__rate + self._RATE_INCREASE / self.__rate)
+
+    def throttled(self, retry_after=None):
+        """Multiplicative decrease, and pause until Retry-After if provided.
+
+        :param retry_after: float: seconds
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__refill(now)
+
+            if now - self.__decreased >= self._DECREASE_HOLD_SECS:
+                self.__decreased = now
+                self.__rate = max(self._RATE_MIN, self.__rate * self._RATE_DECREASE)
+
+            self.__tokens = min(self.__tokens, 0.0)
+            if retry_after:
+                self.__updated = max(self.__updated, now + retry_after)
+
+            self.logger.warning(
+                "Rate Limit: Throttled",
+                extra={'rate': round(self.__rate, 2), 'retry_after': retry_after}
+            )
+
+    def __quota_day_roll(self):
+        today = self.today()
+        if today != self.__quota_day:
+            self.__quota_day, self.__quota_used = today, 0
+
+    def __quota_check(self):
+        self.__quota_day_roll()
+        if self.daily_quota is not None and self.__quota_used >= self.daily_quota:
+            raise RateLimitQuotaExceeded(
+                "Daily quota of {0} requests used up for {1}".format(self.daily_quota, self.__quota_day)
+            )
+
+    def __refill(self, now):
+        elapsed = now - self.__updated
+        if elapsed > 0:
+            self.__tokens = min(self.__burst, self.__tokens + elapsed * self.__rate)
+            self.__updated = now
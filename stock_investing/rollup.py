@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace stock_investing
+
+import numpy as np
+
+from stock_investing.analytics import compensated_sums
+from stock_investing.price_store import COLUMN_DATE
+
+# Price columns rolled up by month.
+ROLLUP_COLUMNS = ["Open", "Close"]
+
+_ROLLUP_FIELDS = ("days", "open_sum", "open_count", "close_sum", "close_count")
+
+
+def month_rollup_row(arrays):
+    """Rollup row of a month's rows ordered by Date: number of days, sum and count of Open and of Close.
+
+    Sums are compensated as by the analytics engines, see compensated_sums().
+
+    :param arrays: dict: column arrays of month
+    :return: tuple: (days, open_sum, open_count, close_sum, close_count)
+    """
+    row = [len(arrays.get(COLUMN_DATE, ()))]
+    for column in ROLLUP_COLUMNS:
+        sums, counts = compensated_sums(arrays.get(column, np.full(row[0], np.nan)), [0])
+        row += [float(sums[0]), int(counts[0])]
+    return tuple(row)
+
+
+class StockMonthlyRollup(object):
+    """Per-symbol table of monthly sums and counts of Open and of Close, one
+        row per month ordered by month, sufficient to answer average monthly
+        Open and Close of any range of whole months without its daily history.
+
+        A month's row is replaced whenever its symbol-month cache entry
+        changes, i.e. upon fetch, re-fetch or bulk import of any of its days;
+        persisted per symbol as a JSON-serializable dict.
+    """
+    def __init__(self):
+        self.__months = np.empty(0, dtype=np.int64)
+        self.__values = {
+            field: np.empty(0, dtype=np.float64 if field.endswith("_sum") else np.int64) for field in _ROLLUP_FIELDS
+        }
+
+    @property
+    def months(self):
+        """'YYYY-MM' of rows"""
+        return self.__months.astype("datetime64[M]").astype(str).tolist()
+
+    def __len__(self):
+        return len(self.__months)
+
+    def __contains__(self, month):
+        return self.__row_index(month) is not None
+
+    def update(self, month, arrays):
+        """Replace row of month by the rollup of its rows.
+
+        :param month: 'YYYY-MM'
+        :param arrays: dict: column arrays of every row of month held
+        """
+        row = month_rollup_row(arrays)
+        index = self.__row_index(month)
+        if index is None:
+            month_value = np.datetime64(month, "M").astype(np.int64)
+            index = int(np.searchsorted(self.__months, month_value))
+            self.__months = np.insert(self.__months, index, month_value)
+            for field, value in zip(_ROLLUP_FIELDS, row):
+                self.__values[field] = np.insert(self.__values[field], index, value)
+        else:
+            for field, value in zip(_ROLLUP_FIELDS, row):
+                self.__values[field][index] = value
+
+    def select(self, months):
+        """Rollup of rows of months alone.
+
+        :param months: list of 'YYYY-MM'
+        :return: StockMonthlyRollup
+        """
+        selected = np.isin(self.__months, np.array(months, dtype="datetime64[M]").astype(np.int64))
+        rollup = StockMonthlyRollup()
+        rollup.__months = self.__months[selected]
+        rollup.__values = {field: values[selected] for field, values in self.__values.items()}
+        return rollup
+
+    def averages(self):
+        """Average Monthly Open and Close of months having days, as computed over days.
+
+        :return: list of {'month', 'average_open', 'average_close'}
+        """
+        values = [self.__values[field].tolist() for field in _ROLLUP_FIELDS]
+        return [
+            {
+                'month': month,
+                'average_open': round(open_sum / open_count, 2) if open_count else float('nan'),
+                'average_close': round(close_sum / close_count, 2) if close_count else float('nan')
+            }
+            for month, days, open_sum, open_count, close_sum, close_count in zip(self.months, *values)
+            if days
+        ]
+
+    def to_dict(self):
+        value = {"months": self.months}
+        value.update({field: values.tolist() for field, values in self.__values.items()})
+        return value
+
+    @classmethod
+    def from_dict(cls, value):
+        rollup = cls()
+        rollup.__months = np.array(value["months"], dtype="datetime64[M]").astype(np.int64)
+        rollup.__values = {
+            field: np.array(value[field], dtype=values.dtype) for field, values in rollup.__values.items()
+        }
+        return rollup
+
+    def __row_index(self, month):
+        month_value = np.datetime64(month, "M").astype(np.int64)
+        index = int(np.searchsorted(self.__months, month_value))
+        if index < len(self.__months) and self.__months[index] == month_value:
+            return index
+        return None
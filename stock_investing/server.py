@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace stock_investing
+
+import os
+import math
+import time
+import socket
+import logging
+import threading
+import socketserver
+import datetime as dt
+from http.server import (BaseHTTPRequestHandler, ThreadingHTTPServer)
+from urllib.parse import (urlsplit, parse_qs)
+
+import ujson as json
+import numpy as np
+
+from stock_investing.analytics import (StockInvestorArrayAnalytics, StockInvestorTask, tasks_columns)
+from stock_investing.price_store import (COLUMN_DATE, EPOCH_ORDINAL)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+ADDRESS_DEFAULT = "127.0.0.1:8080"
+
+
+class StockInvestorQueryError(ValueError):
+    """Query not answerable from the resident snapshot, e.g. invalid parameters."""
+    pass
+
+
+def json_dumps(value):
+    """Serialize query result as JSON bytes, NaN as null."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_nan_to_none(value)).encode("utf-8")
+
+
+def _nan_to_none(value):
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _nan_to_none(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_nan_to_none(item) for item in value]
+    return value
+
+
+class StockInvestorSnapshot(object):
+    """Resident price data of a set of stocks over [start, end] date ordinals:
+        per-stock column arrays ordered by Date, holding the columns of tasks
+        alone. Immutable once loaded, so that it is read by any number of
+        query threads while the next snapshot is being loaded.
+    """
+    def __init__(self, stocks, start, end, stocks_arrays):
+        """Initialize
+
+        :param stocks: list: stock symbols, ordering results
+        :param start: date ordinal of first day
+        :param end: date ordinal of last day
+        :param stocks_arrays: dict: stock to column arrays ordered by Date, Date as int64 days since epoch
+        """
+        self.stocks = stocks
+        self.start = start
+        self.end = end
+        self.stocks_arrays = stocks_arrays
+        self.loaded_at = dt.datetime.now(dt.timezone.utc)
+
+    @classmethod
+    def load(cls, investor):
+        """Fetch, or serve from cache, data of a StockInvestor's stocks and date range.
+
+        :param investor: StockInvestor
+        :return: StockInvestorSnapshot
+        """
+        investor.work_fetch()
+        return cls.from_investor(investor)
+
+    @classmethod
+    def from_investor(cls, investor):
+        """Snapshot of data collected by a StockInvestor, over its stocks and date range.
+
+        :param investor: StockInvestor, its data fetched
+        :return: StockInvestorSnapshot
+        """
+        columns = [COLUMN_DATE] + tasks_columns(StockInvestorTask.all())
+        stocks_arrays = {}
+        for stock in investor.stocks:
+            stock_data = investor.stocks_data[stock]
+            stock_data.sort()
+            stock_arrays = stock_data.to_dict()
+            # Copied out of the store's buffers, sized to rows.
+            stocks_arrays[stock] = {
+                column: stock_arrays[column].copy() if column in stock_arrays else np.full(len(stock_data), np.nan)
+                for column in columns
+            } if len(stock_data) else {}
+
+        start, end = investor.interval
+        return cls(list(investor.stocks), start, end, stocks_arrays)
+
+    @property
+    def rows(self):
+        return sum(len(arrays.get(COLUMN_DATE, ())) for arrays in self.stocks_arrays.values())
+
+    def slices(self, stocks, start, end):
+        """Views of stocks rows within [start, end] date ordinals."""
+        slices = {}
+        for stock in stocks:
+            arrays = self.stocks_arrays.get(stock)
+            if not arrays:
+                slices[stock] = {}
+                continue
+            days = arrays[COLUMN_DATE]
+            first = int(np.searchsorted(days, start - EPOCH_ORDINAL, side="left"))
+            last = int(np.searchsorted(days, end - EPOCH_ORDINAL, side="right"))
+            slices[stock] = {column: array[first:last] for column, array in arrays.items()}
+        return slices
+
+    def query(self, tasks, stocks=None, start_date=None, end_date=None):
+        """Compute tasks over stocks rows within dates.
+
+        :param tasks: list of StockInvestorTask
+        :param stocks: list: stock symbols within snapshot, default: all
+        :param start_date: 'YYYY-MM-DD', default: snapshot start
+        :param end_date: 'YYYY-MM-DD', default: snapshot end
+        :return: dict: task to its result
+        """
+        if not tasks or not all(StockInvestorTask.validate(task) for task in tasks):
+            raise StockInvestorQueryError("Invalid tasks: {}".format(tasks))
+
+        stocks = stocks or self.stocks
+        missing = [stock for stock in stocks if stock not in self.stocks_arrays]
+        if missing:
+            raise StockInvestorQueryError("Stocks not served: {}".format(",".join(missing)))
+
+        try:
+            start = dt.datetime.strptime(start_date, "%Y-%m-%d").toordinal() if start_date else self.start
+            end = dt.datetime.strptime(end_date, "%Y-%m-%d").toordinal() if end_date else self.end
+        except (TypeError, ValueError) as ex:
+            raise StockInvestorQueryError(str(ex))
+        if start < self.start or end > self.end or start > end:
+            raise StockInvestorQueryError("Dates not within served range: {} - {}".format(
+                dt.date.fromordinal(self.start), dt.date.fromordinal(self.end)
+            ))
+
+        return StockInvestorArrayAnalytics(self.slices(stocks, start, end), stocks).run(tasks)
+
+    def status(self):
+        return {
+            "stocks": self.stocks,
+            "start_date": dt.date.fromordinal(self.start).isoformat(),
+            "end_date": dt.date.fromordinal(self.end).isoformat(),
+            "rows": self.rows,
+            "loaded_at": self.loaded_at.isoformat(),
+        }
+
+
+class StockInvestorServer(object):
+    """Long-running server answering task queries over a resident snapshot of
+        price data, through a local HTTP or Unix socket API:
+
+        + GET /<task>?stocks=A,B&start-date=YYYY-MM-DD&end-date=YYYY-MM-DD: result of task
+        + GET /tasks?tasks=<task>,<task>&...: results keyed by task
+        + GET /status: snapshot stocks, date range, rows and load time
+
+        Omitted stocks and dates default to those of the snapshot. The snapshot
+        is loaded once before serving, then refreshed in the background every
+        refresh seconds: only days not yet cached are fetched, and the new
+        snapshot replaces the previous one at once, queries in progress keeping
+        the one they started with. Queries are computed by
+        StockInvestorArrayAnalytics over array views, without DataFrame.
+    """
+    _REFRESH_SECS = 3600
+
+    @property
+    def snapshot(self):
+        return self.__snapshot
+
+    def __init__(self, investor_factory, address=None, socket_path=None, refresh_secs=None, logger=None):
+        """Initialize
+
+        :param investor_factory: callable() returning StockInvestor of stocks and date range to load,
+            called upon every refresh so that its date range may follow the current date.
+        :param address: 'HOST:PORT' to listen on, default: ADDRESS_DEFAULT
+        :param socket_path: Unix socket path to listen on, instead of address.
+        :param refresh_secs: Seconds between snapshot refreshes, 0 disables refreshing.
+        :param logger:
+        """
+        self.logger = logger or log
+        self.investor_factory = investor_factory
+        self.address = address or ADDRESS_DEFAULT
+        self.socket_path = socket_path
+        self.refresh_secs = self._REFRESH_SECS if refresh_secs is None else refresh_secs
+
+        self.__snapshot = None
+        self.__stopped = threading.Event()
+        self.__httpd = None
+
+    def load(self):
+        """Load a new snapshot, replacing the current one."""
+        start_time = time.perf_counter()
+        snapshot = StockInvestorSnapshot.load(self.investor_factory())
+        self.__snapshot = snapshot
+
+        self.logger.info(
+            "Server: Snapshot: Loaded",
+            extra=dict(snapshot.status(), seconds=round(time.perf_counter() - start_time, 3))
+        )
+
+    def refresh(self):
+        """Reload snapshot every refresh_secs until stopped, keeping the current one upon failure."""
+        while not self.__stopped.wait(self.refresh_secs):
+            try:
+                self.load()
+            except Exception as ex:
+                self.logger.error(
+                    "Server: Snapshot: Refresh Failed",
+                    extra={'error_exception': type(ex).__name__, 'error_details': str(ex)}
+                )
+
+    def query(self, tasks, stocks=None, start_date=None, end_date=None):
+        """Compute tasks over the current snapshot.
+
+        :param tasks: list of StockInvestorTask
+        :param stocks: list: stock symbols within snapshot, default: all
+        :param start_date: 'YYYY-MM-DD', default: snapshot start
+        :param end_date: 'YYYY-MM-DD', default: snapshot end
+        :return: dict: task to its result
+        """
+        snapshot = self.__snapshot
+        if snapshot is None:
+            raise StockInvestorQueryError("No snapshot loaded")
+
+        return snapshot.query(tasks, stocks=stocks, start_date=start_date, end_date=end_date)
+
+    def serve_forever(self):
+        """Load snapshot, start background refresh, and answer queries until shutdown()."""
+        self.load()
+
+        if self.refresh_secs:
+            threading.Thread(target=self.refresh, name="snapshot-refresh", daemon=True).start()
+
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self.__httpd = ThreadingUnixHTTPServer(self.socket_path, StockInvestorRequestHandler)
+        else:
+            host, _, port = self.address.rpartition(":")
+            self.__httpd = ThreadingHTTPServer((host or "127.0.0.1", int(port)), StockInvestorRequestHandler)
+        self.__httpd.investor_server = self
+
+        self.logger.info("Server: Listening", extra={'address': self.socket_path or self.address})
+        try:
+            self.__httpd.serve_forever()
+        finally:
+            self.__stopped.set()
+            self.__httpd.server_close()
+            if self.socket_path and os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def shutdown(self):
+        self.__stopped.set()
+        if self.__httpd is not None:
+            self.__httpd.shutdown()
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class StockInvestorRequestHandler(BaseHTTPRequestHandler):
+    """Task queries, see StockInvestorServer."""
+    protocol_version = "HTTP/1.1"
+    # Headers and body written at once, flushed after each request, without delay.
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        if self.request.family not in (socket.AF_INET, socket.AF_INET6):
+            self.disable_nagle_algorithm = False
+        super(StockInvestorRequestHandler, self).setup()
+
+    def do_GET(self):
+        investor_server = self.server.investor_server
+        url = urlsplit(self.path)
+        path = url.path.strip("/")
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        if path == "status":
+            snapshot = investor_server.snapshot
+            self.send_json(200, snapshot.status() if snapshot else {})
+            return
+
+        if path == "tasks":
+            tasks = params.get("tasks", "").split(",")
+        elif StockInvestorTask.validate(path):
+            tasks = [path]
+        else:
+            self.send_json(404, {"error": "Not found: /{}".format(path)})
+            return
+
+        try:
+            results = investor_server.query(
+                tasks,
+                stocks=params["stocks"].split(",") if params.get("stocks") else None,
+                start_date=params.get("start-date"),
+                end_date=params.get("end-date")
+            )
+        except StockInvestorQueryError as ex:
+            self.send_json(400, {"error": str(ex)})
+            return
+        except Exception as ex:
+            investor_server.logger.error(
+                "Server: Query Failed",
+                extra={'path': self.path, 'error_exception': type(ex).__name__, 'error_details': str(ex)}
+            )
+            self.send_json(500, {"error": type(ex).__name__})
+            return
+
+        self.send_json(200, results if path == "tasks" else results[path])
+
+    def send_json(self, status_code, value):
+        body = json_dumps(value)
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        self.server.investor_server.logger.debug("Server: " + format % args)
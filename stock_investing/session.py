@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace stock_investing
+
+import time
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from pyhttpstatus_utils import HttpStatusCode
+
+from pyfortified_requests.support import (REQUEST_RETRY_HTTP_STATUS_CODES)
+
+log = logging.getLogger(__name__)
+
+
+class StockInvestorHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter keeping per-thread request metrics; per-connection metrics are
+        read from its urllib3 connection pools. Each request waits upon the rate
+        limiter, if any, which is then informed of the response.
+    """
+    def __init__(self, *args, rate_limiter=None, **kwargs):
+        self.__lock = threading.Lock()
+        self.__threads = {}
+        self.rate_limiter = rate_limiter
+        super(StockInvestorHTTPAdapter, self).__init__(*args, **kwargs)
+
+    def send(self, request, *args, **kwargs):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        start_time = time.perf_counter()
+        try:
+            response = super(StockInvestorHTTPAdapter, self).send(request, *args, **kwargs)
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(response.status_code, response.headers)
+            return response
+        finally:
+            elapsed = time.perf_counter() - start_time
+            thread_name = threading.current_thread().name
+            with self.__lock:
+                thread_metrics = self.__threads.setdefault(thread_name, {"requests": 0, "seconds": 0.0})
+                thread_metrics["requests"] += 1
+                thread_metrics["seconds"] += elapsed
+
+    def metrics(self):
+        """Requests and seconds spent per thread; connections opened and requests per host pool.
+
+        :return: dict
+        """
+        with self.__lock:
+            threads = {name: dict(thread_metrics) for name, thread_metrics in self.__threads.items()}
+
+        pools = {}
+        for pool_key in list(self.poolmanager.pools.keys()):
+            pool = self.poolmanager.pools.get(pool_key)
+            if pool is None:
+                continue
+            pools["{0}://{1}:{2}".format(pool_key.key_scheme, pool_key.key_host, pool_key.key_port)] = {
+                "connections": pool.num_connections,
+                "requests": pool.num_requests,
+            }
+
+        return {"threads": threads, "pools": pools}
+
+
+class StockInvestorSession(object):
+    """Pooled HTTP session shared by all fetching threads.
+
+        Holds a single requests.Session whose connection pool per host is sized
+        to the number of worker threads and blocks when exhausted, so that each
+        thread reuses a kept-alive HTTP/1.1 connection, rather than opening a
+        connection (and TLS handshake) that the pool would then discard.
+
+        With a rate limiter, TOO_MANY_REQUESTS and Retry-After are left to it
+        rather than retried by the adapter.
+    """
+    _RETRY_TRIES = 3
+    _RETRY_BACKOFF = 0.1
+
+    @property
+    def session(self):
+        return self.__session
+
+    @property
+    def pool_size(self):
+        return self.__pool_size
+
+    def __init__(self, pool_size, pool_block=True, retry_codes=None, rate_limiter=None, logger=None):
+        """Initialize
+
+        :param pool_size: Connections kept alive per host, the number of worker threads.
+        :param pool_block: Wait for a pooled connection rather than opening one beyond pool_size.
+        :param retry_codes: HTTP status codes retried by the adapter
+        :param rate_limiter: StockInvestorRateLimiter consulted before each request.
+        :param logger:
+        """
+        assert pool_size and pool_size > 0
+
+        self.logger = logger or log
+        self.__pool_size = pool_size
+
+        if retry_codes is None:
+            retry_codes = set(REQUEST_RETRY_HTTP_STATUS_CODES)
+        if rate_limiter is not None:
+            retry_codes = set(retry_codes) - {HttpStatusCode.TOO_MANY_REQUESTS}
+
+        self.__adapter = StockInvestorHTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            pool_block=pool_block,
+            max_retries=Retry(
+                total=self._RETRY_TRIES,
+                backoff_factor=self._RETRY_BACKOFF,
+                status_forcelist=retry_codes,
+                respect_retry_after_header=rate_limiter is None,
+            ),
+            rate_limiter=rate_limiter
+        )
+
+        self.__session = requests.Session()
+        self.__session.headers["Connection"] = "keep-alive"
+        self.__session.mount("http://", self.__adapter)
+        self.__session.mount("https://", self.__adapter)
+
+    def metrics(self):
+        """Connection reuse metrics, see StockInvestorHTTPAdapter.metrics()
+
+        :return: dict: also totals of requests, connections opened and requests per connection.
+        """
+        metrics = self.__adapter.metrics()
+        requests_count = sum(pool["requests"] for pool in metrics["pools"].values())
+        connections_count = sum(pool["connections"] for pool in metrics["pools"].values())
+        metrics.update({
+            "requests": requests_count,
+            "connections": connections_count,
+            "requests_per_connection": round(requests_count / connections_count, 2) if connections_count else None,
+        })
+        return metrics
+
+    def close(self):
+        """Log metrics and close pooled connections."""
+        self.logger.debug("Session: Metrics", extra=self.metrics())
+        self.__session.close()
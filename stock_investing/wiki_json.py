@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace stock_investing
+
+import re
+
+import ujson as json
+import numpy as np
+
+from stock_investing.price_store import (StockPriceStore, COLUMN_DATE, column_dtype)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_DATA_KEY = b'"data":'
+_DATE_QUOTED = re.compile(rb'"(\d{4})-(\d{2})-(\d{2})"')
+
+
+def json_loads(content):
+    """Parse JSON bytes, with orjson if installed."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def yyyymmdd_to_days(values):
+    """Convert YYYYMMDD numbers into int64 days since epoch."""
+    values = np.asarray(values, dtype=np.int64)
+    years = values // 10000 - 1970
+    months = (values // 100) % 100 - 1
+    days = values % 100 - 1
+    return (
+        years.astype("datetime64[Y]").astype("datetime64[M]") + months
+    ).astype("datetime64[D]").astype(np.int64) + days
+
+
+def decode_dataset_data(content):
+    """Decode a WIKI API dataset data response body straight into column arrays.
+
+    The 'dataset_data.data' array is cut out of the body, and its quoted
+    dates rewritten as YYYYMMDD numbers, so that it parses into rows of
+    numbers only, converted at once into a float64 matrix whose Date column
+    is then turned into days since epoch: no per-value Python work, and no
+    date strings. The remaining envelope is parsed as JSON. Any body not
+    laid out as expected is decoded through JSON parsing of its rows.
+
+    :param content: bytes: Response body
+    :return: (columns, arrays): 'column_names', and dict of column name to array, Date as int64 days since epoch.
+    """
+    data_start = content.find(_DATA_KEY)
+    if data_start < 0:
+        return decode_dataset_data_rows(content)
+
+    array_start = data_start + len(_DATA_KEY)
+    while content[array_start:array_start + 1].isspace():
+        array_start += 1
+    if content[array_start:array_start + 2] == b"[]":
+        array_end = array_start + 2
+    else:
+        # Rows hold numbers, nulls and date strings: the first ']]' closes the data array.
+        array_end = content.find(b"]]", array_start)
+        if content[array_start:array_start + 1] != b"[" or array_end < 0:
+            return decode_dataset_data_rows(content)
+        array_end += 2
+
+    envelope = json_loads(content[:array_start] + b"[]" + content[array_end:])
+    columns = envelope["dataset_data"]["column_names"]
+    if not columns or columns[0] != COLUMN_DATE:
+        return decode_dataset_data_rows(content)
+
+    data = content[array_start:array_end]
+    if data.count(b"-") == data.count(b'"'):
+        # Two dashes per quoted date: no minus sign, of values nor exponents, so every dash and quote is removed.
+        data = data.translate(None, b'"-')
+    else:
+        data = _DATE_QUOTED.sub(rb"\1\2\3", data)
+
+    try:
+        matrix = np.array(json_loads(data), dtype=np.float64)
+    except (ValueError, TypeError):
+        return decode_dataset_data_rows(content)
+
+    if not len(matrix):
+        return columns, {column: np.empty(0, dtype=column_dtype(column)) for column in columns}
+    if matrix.ndim != 2 or matrix.shape[1] != len(columns):
+        return decode_dataset_data_rows(content)
+
+    arrays = {COLUMN_DATE: yyyymmdd_to_days(matrix[:, 0])}
+    for index, column in enumerate(columns[1:], start=1):
+        arrays[column] = np.ascontiguousarray(matrix[:, index], dtype=column_dtype(column))
+
+    return columns, arrays
+
+
+def decode_dataset_data_rows(content):
+    """Decode a WIKI API dataset data response body through JSON parsing of its rows.
+
+    :param content: bytes: Response body
+    :return: (columns, arrays), see decode_dataset_data()
+    """
+    dataset_data = json_loads(content)["dataset_data"]
+    columns = dataset_data["column_names"]
+    data = dataset_data["data"]
+    if not data:
+        return columns, {column: np.empty(0, dtype=column_dtype(column)) for column in columns}
+
+    return columns, StockPriceStore.rows_arrays(columns, data)
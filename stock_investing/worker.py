@@ -2,47 +2,88 @@
 # -*- coding: utf-8 -*-
 #
 
-from pprintpp import pprint
-import copy
 import sys
 import getopt
 import queue
 import datetime as dt
-import ujson as json
-import requests
 
-import pandas as pd
-pd.set_option('display.float_format', lambda x: '%.4f' % x)
+import numpy as np
 
-import time
+import os
 import logging
 from concurrent import futures
 from urllib.parse import unquote as urldecode
-from pyhttpstatus_utils import HttpStatusCode
 
-from pyfortified_cache import (CacheClient, create_cache_key)
 import pyfortified_dateutil
 
 from pyfortified_logging import (get_logger, LoggingFormat, LoggingOutput)
-from pyfortified_requests.errors import (
-    get_exception_message,
+
+# Pandas, pprintpp and the HTTP stack (requests, requests-fortified, StockInvestorSession) are imported
+# upon first use: neither --help, nor a query served from cache, pays for them.
+
+if __package__ in (None, ""):
+    # Invoked as script: stock_investing/worker.py
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stock_investing.cache import (
+    StockInvestorCache,
+    StockInvestorCacheIndex,
+    CACHE_DIR_DEFAULT,
+    date_to_ordinal,
+    day_cache_key,
+    ordinal_to_date,
+    intervals_intersect,
+    intervals_merge,
+    intervals_subtract,
+    month_cache_key,
+    month_interval,
+    months_within,
+    stock_cache_key,
+    stock_start_cache_key,
+)
+from stock_investing.analytics import (
+    StockInvestorAnalytics,
+    StockInvestorArrayAnalytics,
+    StockInvestorTask,
+    biggest_loser,
+    tasks_columns,
+)
+from stock_investing.dataset import StockInvestorDataset
+from stock_investing.aggregates import (StockAggregates, busy_days, month_summary, volume_busy)
+from stock_investing.price_store import (
+    StockPriceStore,
+    COLUMN_DATE,
+    WIKI_COLUMN_DTYPES,
+    EPOCH_ORDINAL,
+    column_index,
+    dates_to_days,
 )
-from pyfortified_requests.support import (
-    base_class_name,
-    HEADER_CONTENT_TYPE_APP_JSON,)
-from pyfortified_requests import RequestsFortifiedDownload
+from stock_investing.rollup import (StockMonthlyRollup, ROLLUP_COLUMNS)
+from stock_investing.rate_limit import (StockInvestorRateLimiter, RateLimitQuotaExceeded)
+from stock_investing.support import get_exception_message
+from stock_investing.wiki_json import decode_dataset_data
+from stock_investing import codec
 
 SECONDS_FOR_60_MINUTES = 3600
 URL_QUANDL_WIKI_TMPL = "https://www.quandl.com/api/v3/datasets/WIKI/{0}/data.json"
 
-class StockInvestorTask(object):
+
+def pandas_import():
+    """Pandas, imported upon first Dataframe assembled, floats displayed as by '%.4f'."""
+    import pandas as pd
+    pd.set_option('display.float_format', lambda x: '%.4f' % x)
+    return pd
+
+
+class StockInvestorEngine(object):
     """ENUM
     """
-    UNDEFINED = None
-    AVERAGE_MONTHLY_OPEN_CLOSE = "avg-monthly"
-    MAX_DAILY_PROFIT = "max-daily-profit"
-    BUSY_DAY = "busy-day"
-    BIGGEST_LOSER = "biggest-loser"
+    THREADS = "threads"
+    ASYNCIO = "asyncio"
+
+    @staticmethod
+    def validate(value):
+        return value in [StockInvestorEngine.THREADS, StockInvestorEngine.ASYNCIO]
 
 
 class StockInvestorTaskBase(object):
@@ -53,9 +94,10 @@ class StockInvestorTaskBase(object):
     __stock = None
     __start_date = None
     __end_date = None
+    __column = None
     __cache_key = None
 
-    def __init__(self, api_key, stock, start_date, end_date):
+    def __init__(self, api_key, stock, start_date, end_date, column=None):
         assert api_key
         assert stock
         assert start_date
@@ -65,6 +107,7 @@ class StockInvestorTaskBase(object):
         self.__stock = stock
         self.__start_date = start_date
         self.__end_date = end_date
+        self.__column = column
 
     @property
     def request_url(self):
@@ -81,56 +124,84 @@ class StockInvestorTaskBase(object):
     @property
     def end_date(self):
         return self.__end_date
+    @property
+    def column(self):
+        """Single column requested besides Date (column projection), None for every column."""
+        return self.__column
 
     @property
     def str(self):
-        return "{}: '{}' - '{}'".format(
+        return "{}: '{}' - '{}'{}".format(
             self.stock,
             self.start_date,
-            self.end_date
+            self.end_date,
+            "" if self.column is None else ", {}".format(self.column)
         )
 
     @property
     def request_params(self):
-        return {
+        request_params = {
             "api_key": self.api_key,
             "start_date": self.start_date,
             "end_date": self.end_date,
             "order": "asc",
         }
+        if self.column is not None:
+            request_params["column_index"] = column_index(self.column)
+        return request_params
+
+    @property
+    def request_label(self):
+        request_label = "{0}:{1}:{2}".format(self.stock, self.start_date, self.end_date)
+        return request_label if self.column is None else "{0}:{1}".format(request_label, self.column)
+
+    @property
+    def month(self):
+        return self.start_date[:7]
+
+    @property
+    def interval(self):
+        """[start, end] as date ordinals"""
+        return [date_to_ordinal(self.start_date), date_to_ordinal(self.end_date)]
 
     def cache_key(self, cache_group_name):
-        return create_cache_key(
-            request_params=self.request_params,
-            request_url=self.request_url,
-            cache_group_name=cache_group_name,
-            client_unique_hash=None
-        )
+        """Cache key of this task's symbol-month, independent of its exact date range."""
+        return month_cache_key(self.stock, self.month, cache_group_name)
 
 
 class StockInvestorRequest(StockInvestorTaskBase):
     """StockInvestorRequest
     Base handler of content for processed Task requests.
     """
-    def __init__(self, api_key, stock, start_date, end_date):
-        super(StockInvestorRequest, self).__init__(api_key, stock, start_date, end_date)
+    def __init__(self, api_key, stock, start_date, end_date, column=None):
+        super(StockInvestorRequest, self).__init__(api_key, stock, start_date, end_date, column)
 
 
 class StockInvestorResponse(StockInvestorTaskBase):
     """StockInvestorResponse
-    Base handler of content for processed Task responses.
+    Base handler of content for processed Task responses, held as column arrays.
     """
-    def __init__(self, api_key, stock, start_date, end_date, columns, data):
-        super(StockInvestorResponse, self).__init__(api_key, stock, start_date, end_date)
+    def __init__(self, api_key, stock, start_date, end_date, columns, arrays, column=None):
+        super(StockInvestorResponse, self).__init__(api_key, stock, start_date, end_date, column)
         self.__columns = columns
-        self.__data = data
+        self.__arrays = arrays
 
     @property
     def columns(self):
         return self.__columns
     @property
+    def arrays(self):
+        """dict: column name to array, Date as int64 days since epoch"""
+        return self.__arrays
+    @property
     def data(self):
-        return self.__data
+        """Rows in WIKI JSON layout, Date as 'YYYY-MM-DD'."""
+        store = StockPriceStore(self.columns)
+        store.append_arrays(self.arrays)
+        return store.rows()
+
+    def __len__(self):
+        return len(self.arrays[COLUMN_DATE])
 
     @property
     def str(self):
@@ -139,12 +210,46 @@ class StockInvestorResponse(StockInvestorTaskBase):
             self.start_date,
             self.end_date,
             self.columns,
-            len(self.data)
+            len(self)
         )
 
     def serialize(self):
         return {"data": self.data, "columns": self.columns}
 
+    def split(self):
+        """Split a ranged response into responses by calendar month, to be
+        stored as month-keyed cache entries.
+
+        :return: list of StockInvestorResponse
+        """
+        days = self.arrays[COLUMN_DATE]
+
+        wresps = []
+        month_start_datetime = dt.datetime.strptime(self.start_date, "%Y-%m-%d")
+        end_datetime = dt.datetime.strptime(self.end_date, "%Y-%m-%d")
+        while month_start_datetime <= end_datetime:
+            next_month_datetime = (month_start_datetime.replace(day=28) + dt.timedelta(days=4)).replace(day=1)
+            month_end_datetime = min(next_month_datetime - dt.timedelta(days=1), end_datetime)
+
+            month_start_date = month_start_datetime.strftime("%Y-%m-%d")
+            month_end_date = month_end_datetime.strftime("%Y-%m-%d")
+            month_start_day, month_end_day = dates_to_days([month_start_date, month_end_date])
+            within = (days >= month_start_day) & (days <= month_end_day)
+            wresps.append(
+                StockInvestorResponse(
+                    api_key=self.api_key,
+                    stock=self.stock,
+                    start_date=month_start_date,
+                    end_date=month_end_date,
+                    columns=self.columns,
+                    arrays={column: array[within] for column, array in self.arrays.items()},
+                    column=self.column
+                )
+            )
+            month_start_datetime = next_month_datetime
+
+        return wresps
+
 
 class StockInvestor(object):
     """Core class of this application. Provided a data range and a set of Stock symbols,
@@ -155,6 +260,10 @@ class StockInvestor(object):
     __VERSION = "0.1.0"
 
     _MAX_WORKERS = 10
+    _MAX_REQUEST_MONTHS = 120
+    _MAX_REQUEST_TRIES = 10
+    _MAX_PROJECTED_COLUMNS = 2
+    _STREAM_WINDOW_STOCKS = _MAX_WORKERS
 
     @property
     def worker_queue(self):
@@ -191,6 +300,27 @@ class StockInvestor(object):
     def task(self, value):
         self.__task = value
 
+    @property
+    def tasks(self):
+        return self.__tasks
+    @tasks.setter
+    def tasks(self, value):
+        self.__tasks = value
+
+    @property
+    def engine(self):
+        return self.__engine
+    @engine.setter
+    def engine(self, value):
+        self.__engine = value
+
+    @property
+    def concurrency(self):
+        return self.__concurrency
+    @concurrency.setter
+    def concurrency(self, value):
+        self.__concurrency = value
+
     @property
     def cache(self):
         return self.__cache
@@ -219,19 +349,62 @@ class StockInvestor(object):
         """Initialize
         """
         self.worker_queue = queue.Queue()
+        self.df = None
         self.verbose = kv.get("verbose", False)
         self.task = kv.get("task", None)
+        self.tasks = kv.get("tasks", None) or [self.task or StockInvestorTask.AVERAGE_MONTHLY_OPEN_CLOSE]
         self.api_key = kv.get("api-key", None)
         self.start_datetime = kv.get("start-datetime", None)
         self.end_datetime = kv.get("end-datetime", None)
         self.stocks = kv.get("stocks", None)
+        self.engine = kv.get("engine", StockInvestorEngine.THREADS)
+        self.concurrency = kv.get("concurrency", None)
+        self.rate_limit = kv.get("rate-limit", None)
+        self.daily_quota = kv.get("daily-quota", None)
 
         assert self.api_key
         assert self.start_datetime
         assert self.end_datetime
         assert self.stocks
-
-        self.cache = CacheClient(cache_name="stock-investor")
+        assert all(StockInvestorTask.validate(task) for task in self.tasks)
+        assert StockInvestorEngine.validate(self.engine)
+
+        self.cache_dir = kv.get("cache-dir", CACHE_DIR_DEFAULT)
+        self.cache = StockInvestorCache(cache_name="stock-investor", cache_dir=self.cache_dir)
+        self.cache_index = StockInvestorCacheIndex(self.cache)
+        self.cached_months = {}
+        self.stocks_columns = {}
+
+        self.dataset_path = kv.get("dataset", None)
+        self.dataset = None
+        self.parquet_export_path = kv.get("export-parquet", None)
+        self.parquet_import_path = kv.get("from-parquet", None)
+
+        # Incremental, summaries and stream modes apply to fetched data only.
+        fetched = not (self.dataset_path or self.parquet_import_path)
+        self.incremental = kv.get("incremental", False) and fetched
+        self.summaries = kv.get("summaries", False) and fetched and not self.incremental
+        self.stream = kv.get("stream", False) and fetched and not (self.incremental or self.summaries)
+
+        # Average monthly Open and Close alone is looked up from per-symbol monthly rollups.
+        self.rollup = self.tasks == [StockInvestorTask.AVERAGE_MONTHLY_OPEN_CLOSE] and fetched and \
+            not (self.parquet_export_path or self.incremental or self.summaries or self.stream)
+
+        # Request-level column projection: only columns of tasks are requested, one request per column, when
+        # few enough, otherwise days missing any of them are requested with every column. Modes persisting
+        # rows or aggregates of every column look for and request days with every column.
+        columns = tasks_columns(self.tasks)
+        every_column = self.dataset_path or self.parquet_export_path or self.incremental or self.summaries
+        self.tasks_columns = None if every_column else columns
+        self.request_columns = columns if not every_column and len(columns) <= self._MAX_PROJECTED_COLUMNS else None
+        self.stocks_aggregates = {}
+        self.stocks_rollups = {}
+        self.stocks_rollups_changed = set()
+        self.stocks_results = {}
+        self.stocks_pending = {}
+        self.stocks_cache_keys = {}
+        self.on_stock_results = None
+        self.fetch_requests = 0
 
         self.run_start_time = dt.datetime.now()
 
@@ -251,38 +424,92 @@ class StockInvestor(object):
             logger_output=self.logger_output
         )
 
+        # Shared by all fetching workers: created before any of them starts.
+        self.rate_limiter = StockInvestorRateLimiter(
+            rate=self.rate_limit,
+            burst=self._MAX_WORKERS,
+            daily_quota=self.daily_quota,
+            logger=self.logger
+        )
         self.worker_queue_populate()
         self.__stocks_data = {}
         for stock in self.stocks:
-            self.__stocks_data[stock] = {"columns": None, "data": []}
+            self.__stocks_data[stock] = StockPriceStore()
+
+    def quota_get(self):
+        """Requests issued today against the daily quota, e.g. by previous runs, as kept in cache."""
+        if self.daily_quota is None:
+            return
+        quota, _ = self.cache.get(
+            cache_key=day_cache_key(str(StockInvestorRateLimiter.today()), "quota"), cache_group_name="quota"
+        )
+        if quota:
+            self.rate_limiter.quota_used = max(self.rate_limiter.quota_used, quota["used"])
+
+    def quota_put(self):
+        """Keep requests issued today against the daily quota."""
+        if self.daily_quota is None:
+            return
+        self.cache.put(
+            cache_key=day_cache_key(str(StockInvestorRateLimiter.today()), "quota"),
+            cache_value={"used": self.rate_limiter.quota_used},
+            cache_group_name="quota"
+        )
+
+    __session = None
+    @property
+    def session(self):
+        """Pooled HTTP session, created upon first request, see work_fetch()."""
+        if self.__session is None:
+            from stock_investing.session import StockInvestorSession
+            self.__session = StockInvestorSession(
+                pool_size=self._MAX_WORKERS, rate_limiter=self.rate_limiter, logger=self.logger
+            )
+
+        return self.__session
 
     __base_request = None
     @property
     def base_request(self):
         if self.__base_request is None:
+            from pyfortified_requests import RequestsFortifiedDownload
+            from pyfortified_requests.support import RequestsSessionClient
+
             self.__base_request = RequestsFortifiedDownload(
                 logger_format=self.logger_format,
                 logger_level=self.logger_level,
-                logger_output=self.logger_output
+                logger_output=self.logger_output,
+                requests_client=RequestsSessionClient(session=self.session.session)
             )
 
         return self.__base_request
 
-    def worker_queue_populate(self):
+    def worker_queue_populate(self, stocks_start_datetime=None):
         """Take request parameters and break into separate tasks, primarily by
         stock symbol and monthly segmented stock dates.
+
+        :param stocks_start_datetime: dict: stock to its own start datetime, default: start_datetime of all stocks.
         """
         assert self.start_datetime
         assert self.end_datetime
 
+        if stocks_start_datetime is None:
+            stocks_start_datetime = {stock: self.start_datetime for stock in self.stocks}
+
         # Month granularity
-        for month in pyfortified_dateutil.dates_months_generator(self.start_datetime, self.end_datetime):
-            month_start_datetime, month_end_datetime = pyfortified_dateutil.dates_month_first_last(month, date_format="%Y-%m")
-            if self.start_datetime > month_start_datetime:
-                month_start_datetime = self.start_datetime
-            if self.end_datetime < month_end_datetime:
-                month_end_datetime = self.end_datetime
-            for stock in self.stocks:
+        for stock, start_datetime in stocks_start_datetime.items():
+            if start_datetime > self.end_datetime:
+                continue
+            # Months generated from first day of start month, lest a start day beyond end day skip the last month.
+            month_first_datetime = start_datetime.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            for month in pyfortified_dateutil.dates_months_generator(month_first_datetime, self.end_datetime):
+                month_start_datetime, month_end_datetime = pyfortified_dateutil.dates_month_first_last(
+                    month, date_format="%Y-%m"
+                )
+                if start_datetime > month_start_datetime:
+                    month_start_datetime = start_datetime
+                if self.end_datetime < month_end_datetime:
+                    month_end_datetime = self.end_datetime
                 worker_task = StockInvestorRequest(
                     api_key=self.api_key,
                     stock=stock,
@@ -304,6 +531,115 @@ class StockInvestor(object):
         #         self.logger.debug(worker_task)
         #         self.__worker_queue.put(worker_task)
 
+    def worker_queue_plan(self):
+        """Fetch planner: replace month-slice tasks within worker queue by the
+        requests actually needed.
+
+        Using the range-aware cache index, every month-slice is served by slicing
+        its cached symbol-month entry, and only the intervals of days not yet
+        cached are requested. Contiguous missing intervals of a stock are merged
+        into a single ranged request (up to _MAX_REQUEST_MONTHS months), whose
+        response is later split back into month-keyed cache entries.
+
+        In stream mode, stocks are planned one at a time, so that a stock fully
+        served from cache is emitted before the next one is probed.
+        """
+        stock_wreqs = self.worker_queue_stocks()
+        if self.stream:
+            for stock, wreqs in stock_wreqs.items():
+                self.worker_queue_plan_stocks({stock: wreqs})
+        else:
+            self.worker_queue_plan_stocks(stock_wreqs)
+
+        self.logger.debug("plan: requests: {}".format(self.worker_queue.qsize()))
+
+    def worker_queue_stocks(self):
+        """Drain worker queue into month-slice tasks of each stock.
+
+        :return: dict: stock to list of StockInvestorRequest, stocks in order of worker queue
+        """
+        stock_wreqs = {}
+        while not self.worker_queue.empty():
+            wreq = self.worker_queue.get()
+            stock_wreqs.setdefault(wreq.stock, []).append(wreq)
+        return stock_wreqs
+
+    def worker_queue_plan_stocks(self, stock_wreqs):
+        """Plan month-slice tasks of stocks, see worker_queue_plan().
+
+        :param stock_wreqs: dict: stock to list of month-slice StockInvestorRequest
+        """
+        # Bulk cache probe: all cache keys resolved up front with multi-get.
+        stocks = list(stock_wreqs)
+        self.cache_index.prefetch(stocks, self.tasks_columns)
+        stocks_columns = self.cache.get_multi(
+            [stock_cache_key(stock, "columns") for stock in stocks], cache_group_name="columns"
+        )
+        self.cached_months.update(self.cache_months_decode(self.cache.get_multi(
+            [wreq.cache_key(cache_group_name="data") for wreqs in stock_wreqs.values() for wreq in wreqs],
+            cache_group_name="data",
+            binary=True
+        )))
+
+        columns = self.request_columns or [None]
+        for stock, wreqs in stock_wreqs.items():
+            cached_intervals = {column: self.cache_index.get(stock, column) for column in columns}
+            if columns == [None] and self.tasks_columns:
+                cached_intervals[None] = self.cache_index.get_columns(stock, self.tasks_columns)
+            stock_columns = stocks_columns.get(stock_cache_key(stock, "columns"))
+            if stock_columns is not None:
+                self.stocks_columns[stock] = stock_columns
+
+            # Missing intervals per requested column, None for every column.
+            missing = {column: [] for column in columns}
+            for wreq in wreqs:
+                start, end = wreq.interval
+                cached_month = self.cached_months.get(wreq.cache_key(cache_group_name="data"))
+                if stock_columns is not None and cached_month is not None:
+                    self.work_cache_serve(wreq, cached_month)
+                    for column in columns:
+                        missing[column] += intervals_subtract(start, end, cached_intervals[column])
+                else:
+                    self.logger.debug("cache: miss: {}".format(wreq.str))
+                    for column in columns:
+                        missing[column].append([start, end])
+
+            self.stocks_cache_keys[stock] = [wreq.cache_key(cache_group_name="data") for wreq in wreqs]
+            self.stocks_pending[stock] = 0
+            for column in columns:
+                for start, end in intervals_merge(missing[column]):
+                    for wreq in self.worker_requests(stock, start, end, column):
+                        self.worker_queue.put(wreq)
+                        self.stocks_pending[stock] += 1
+
+            if self.stream and not self.stocks_pending[stock]:
+                self.work_stream_emit(stock)
+
+    def worker_requests(self, stock, start, end, column=None):
+        """Ranged requests over [start, end] date ordinals, each up to _MAX_REQUEST_MONTHS months.
+
+        :param column: Single column requested, None for every column.
+        :return: list of StockInvestorRequest
+        """
+        wreqs = []
+        while start <= end:
+            start_datetime = dt.date.fromordinal(start)
+            months = start_datetime.year * 12 + start_datetime.month - 1 + self._MAX_REQUEST_MONTHS
+            request_end = min(end, dt.date(months // 12, months % 12 + 1, 1).toordinal() - 1)
+
+            wreqs.append(
+                StockInvestorRequest(
+                    api_key=self.api_key,
+                    stock=stock,
+                    start_date=ordinal_to_date(start),
+                    end_date=ordinal_to_date(request_end),
+                    column=column
+                )
+            )
+            start = request_end + 1
+
+        return wreqs
+
     #
     # Worker:
     #
@@ -319,74 +655,681 @@ class StockInvestor(object):
         result = None
 
         try:
-            num_worker_threads = self._MAX_WORKERS
-            with futures.ThreadPoolExecutor(max_workers=num_worker_threads) as executor:
-                # executor.submit schedule self.process_account to be executed
-                # for each account and returns a future representing this
-                # pending operation.
-                threads = []
-                while not self.__worker_queue.empty():
-                    wreq = self.__worker_queue.get()
-
-                    self.logger.debug("cache: pre-get: {}".format(wreq.str))
-                    wresp_data, data_cache_key = self.cache.get(request_url=wreq.request_url, request_params=wreq.request_params, cache_group_name="data")
-                    wresp_columns, columns_cache_key = self.cache.get(request_url=wreq.request_url, request_params=wreq.request_params, cache_group_name="columns")
-
-                    if wresp_data is not None:
-                        self.logger.debug("cache: hit: {}".format(wreq.str))
-
-                        self.stocks_data[wreq.stock]["data"] += wresp_data
-                        self.stocks_data[wreq.stock]["columns"] = wresp_columns
+            if self.parquet_import_path:
+                self.work_parquet_read()
+            elif self.dataset_path:
+                self.work_dataset()
+            elif self.incremental:
+                self.work_incremental()
+            elif self.summaries:
+                self.work_summaries()
+            elif self.rollup:
+                self.work_rollup()
+            elif self.stream:
+                self.work_fetch()
+            else:
+                self.work_fetch()
+                # Served from cache alone: tasks are computed over collected arrays, without Pandas.
+                if self.fetch_requests or self.parquet_export_path:
+                    self.stock_dataframe()
+
+            if self.parquet_export_path:
+                self.work_parquet_write()
+
+            if self.stream or self.incremental or self.summaries or self.rollup:
+                results = self.work_stocks_results()
+            else:
+                results = self.work_tasks(self.tasks)
+
+            # Single task requested by its own option returns its result alone.
+            if self.task is not None and self.tasks == [self.task]:
+                result = results[self.task]
+            else:
+                result = results
+
+        except Exception as ex:
+            self.logger.error(
+                'Worker: Failed: Unexpected Error',
+                extra={'error_exception': type(ex).__name__,
+                       'error_details': get_exception_message(ex)})
+            raise
+
+        return result
+
+    @property
+    def interval(self):
+        """Requested date range as [start, end] date ordinals."""
+        return [self.start_datetime.toordinal(), self.end_datetime.toordinal()]
+
+    def work_dataset(self):
+        """Open memory-mapped dataset at dataset_path. If it does not cover the
+        requested stocks and date range, fetch as usual and merge fetched
+        stocks data into the dataset.
+        """
+        start, end = self.interval
+        self.dataset = StockInvestorDataset.open(self.dataset_path)
+
+        if self.dataset is not None and all(self.dataset.covers(stock, start, end) for stock in self.stocks):
+            self.logger.debug("dataset: hit: {}".format(self.dataset_path))
+            return
+
+        self.logger.debug("dataset: miss: {}".format(self.dataset_path))
+        self.work_fetch()
+        self.dataset = StockInvestorDataset.write(
+            self.dataset_path,
+            self.stocks_data,
+            self.stocks_intervals_collected(),
+            dataset=self.dataset
+        )
+
+    def stocks_intervals_collected(self):
+        """Intervals of requested date range whose days were collected, per stock, as covered by cache:
+        days of failed requests are left out, so that they are fetched again by next run.
+
+        :return: dict: stock to intervals of date ordinals
+        """
+        start, end = self.interval
+        stocks_intervals = {}
+        for stock in self.stocks:
+            stocks_intervals[stock] = intervals_intersect(self.cache_index.get(stock), start, end)
+            if intervals_subtract(start, end, stocks_intervals[stock]):
+                self.logger.warning("Collected: Incomplete: {}".format(stock))
+        return stocks_intervals
+
+    def work_parquet_read(self):
+        """Load price table from Parquet dataset instead of fetching, reading only
+        partitions of requested stocks and years, and columns of requested tasks.
+        """
+        from stock_investing.parquet_store import StockInvestorParquet
+        self.df = StockInvestorParquet(self.parquet_import_path, logger=self.logger).read(
+            self.stocks, self.start_datetime, self.end_datetime, self.tasks
+        )
+
+    def work_parquet_write(self):
+        """Export assembled price table into Parquet dataset."""
+        if self.df is None:
+            self.logger.warning("Parquet: Export: No assembled Dataframe", extra={'path': self.parquet_export_path})
+            return
+
+        from stock_investing.parquet_store import StockInvestorParquet
+        StockInvestorParquet(self.parquet_export_path, logger=self.logger).write(
+            self.df,
+            # Read from Parquet: coverage is that of source dataset, not of cache.
+            None if self.parquet_import_path else self.stocks_intervals_collected()
+        )
+
+    def work_incremental(self):
+        """Incremental mode: per stock, persisted StockAggregates from start date
+        up to a high-water mark (last day aggregated). Only days after the
+        high-water mark are planned and fetched, folded into aggregates, and
+        tasks are answered from aggregates rather than from full history.
+
+        The high-water mark is advanced over days covered by cache alone, so
+        that days of failed requests are fetched again by next run. A stock
+        whose aggregates go beyond end date is aggregated over the date range
+        in full, without storing.
+
+        Aggregates hold no per-day state: busy days are looked for only within
+        months whose highest volume is busy, their days being loaded.
+        """
+        start, end = self.interval
+        start_date = ordinal_to_date(start)
+        aggregates_cache_keys = {
+            stock: stock_start_cache_key(stock, start_date, "aggregates") for stock in self.stocks
+        }
+        found = self.cache.get_multi(list(aggregates_cache_keys.values()), cache_group_name="aggregates")
+
+        stocks_start_datetime = {}
+        stocks_stored = set()
+        for stock, aggregates_cache_key in aggregates_cache_keys.items():
+            aggregates = found.get(aggregates_cache_key)
+            aggregates = StockAggregates.from_dict(aggregates) if aggregates else StockAggregates(start)
+            if aggregates.end > end:
+                self.logger.debug("incremental: {}: beyond end date: {}".format(stock, ordinal_to_date(aggregates.end)))
+                aggregates = StockAggregates(start)
+            else:
+                stocks_stored.add(stock)
+            self.stocks_aggregates[stock] = aggregates
+
+            self.logger.debug("incremental: {}: high-water mark: {}".format(stock, ordinal_to_date(aggregates.end)))
+            stocks_start_datetime[stock] = dt.datetime.fromordinal(aggregates.end + 1)
+
+        self.worker_queue = queue.Queue()
+        self.worker_queue_populate(stocks_start_datetime)
+        self.work_fetch()
+
+        tasks = [task for task in self.tasks if task != StockInvestorTask.BUSY_DAY]
+        for stock, aggregates in list(self.stocks_aggregates.items()):
+            if aggregates.end < end:
+                stock_data = self.stocks_data[stock]
+                stock_data.sort()
+                stock_arrays = stock_data.to_dict()
+
+                missing = intervals_subtract(aggregates.end + 1, end, self.cache_index.get(stock))
+                covered_end = missing[0][0] - 1 if missing else end
+                if stock in stocks_stored and covered_end > aggregates.end:
+                    aggregates.update(stock_arrays, covered_end)
+                    self.cache.put(
+                        cache_key=aggregates_cache_keys[stock],
+                        cache_value=aggregates.to_dict(),
+                        cache_group_name="aggregates"
+                    )
+                if covered_end < end:
+                    self.logger.warning("incremental: {}: incomplete after: {}".format(
+                        stock, ordinal_to_date(covered_end)
+                    ))
+                if aggregates.end < end:
+                    # Answered with every day collected by this run, aggregates stored being left as is.
+                    aggregates = StockAggregates.from_dict(aggregates.to_dict())
+                    aggregates.update(stock_arrays, end)
+                    self.stocks_aggregates[stock] = aggregates
+
+            for task, stock_result in aggregates.results(tasks).items():
+                if stock_result is not None:
+                    self.stocks_results.setdefault(task, {})[stock] = stock_result
+
+        if StockInvestorTask.BUSY_DAY in self.tasks:
+            self.stocks_results[StockInvestorTask.BUSY_DAY] = self.work_incremental_busy_days()
+
+    def work_incremental_busy_days(self):
+        """Incremental mode: busy days of stocks, looked for only within months
+        whose highest volume is busy given the mean volume of the whole range.
+
+        :return: dict: stock to list of busy days
+        """
+        start, end = self.interval
+        stocks_busy_months = {}
+        for stock, aggregates in self.stocks_aggregates.items():
+            stocks_busy_months[stock] = []
+            for month in aggregates.busy_months():
+                month_start, month_end = month_interval(month)
+                stocks_busy_months[stock].append([month, max(start, month_start), min(end, month_end)])
+        self.work_fetch_months(stocks_busy_months)
+
+        stocks_busy = {}
+        for stock, busy_months in stocks_busy_months.items():
+            self.stocks_data[stock].sort()
+            volume_mean = self.stocks_aggregates[stock].volume_mean
+            stocks_busy[stock] = []
+            for _, month_start, month_end in busy_months:
+                month_days = self.stock_days(stock, month_start, month_end)
+                stocks_busy[stock] += busy_days(month_days.get("Date", []), month_days.get("Volume", []), volume_mean)
+        return stocks_busy
+
+    def work_summaries(self):
+        """Summaries mode: answer tasks by merging symbol-month summaries of
+        months fully within date range, plus aggregates of edge days.
+
+        Day data is only loaded for partial edge months and months without
+        summary (whose summary is then stored), and, for busy days, months
+        whose highest volume is busy given the mean volume of the whole range.
+        """
+        start, end = self.interval
+        months = months_within(start, end)
+
+        self.cache_index.prefetch(self.stocks)
+        summaries_found = self.cache.get_multi(
+            [month_cache_key(stock, month, "summary") for stock in self.stocks for month, _, _ in months],
+            cache_group_name="summary"
+        )
+
+        stocks_summaries = {}
+        stocks_day_months = {}
+        for stock in self.stocks:
+            cached_intervals = self.cache_index.get(stock)
+            stocks_summaries[stock] = {}
+            stocks_day_months[stock] = []
+            for month, month_start, month_end in months:
+                summary = summaries_found.get(month_cache_key(stock, month, "summary"))
+                full_month = [month_start, month_end] == month_interval(month)
+                if full_month and summary and not intervals_subtract(month_start, month_end, cached_intervals):
+                    stocks_summaries[stock][month] = StockAggregates.from_dict(summary)
+                else:
+                    stocks_day_months[stock].append([month, month_start, month_end])
+
+        self.logger.debug("summaries: months: {}, summaries: {}".format(
+            len(months) * len(self.stocks), sum(len(summaries) for summaries in stocks_summaries.values())
+        ))
+        self.work_fetch_months(stocks_day_months)
+
+        for stock in self.stocks:
+            self.stocks_data[stock].sort()
+
+            # Months merged in order, days aggregated for months without summary.
+            stock_aggregates = StockAggregates(start)
+            months_aggregates = dict(stocks_summaries[stock])
+            for month, month_start, month_end in stocks_day_months[stock]:
+                month_aggregates = StockAggregates(month_start, keep_days=True)
+                month_aggregates.update(self.stock_days(stock, month_start, month_end), month_end)
+                months_aggregates[month] = month_aggregates
+
+                if [month_start, month_end] == month_interval(month) and \
+                        not intervals_subtract(month_start, month_end, self.cache_index.get(stock)):
+                    # Month cached before summaries were stored
+                    self.work_summary_put(stock, month, self.stock_days(stock, month_start, month_end))
+            for month in sorted(months_aggregates):
+                stock_aggregates.merge(months_aggregates[month])
+
+            tasks = [task for task in self.tasks if task != StockInvestorTask.BUSY_DAY]
+            stock_results = stock_aggregates.results(tasks)
+            if StockInvestorTask.BUSY_DAY in self.tasks:
+                stock_results[StockInvestorTask.BUSY_DAY] = self.work_summaries_busy_days(
+                    stock, stock_aggregates, stocks_summaries[stock], months_aggregates
+                )
+
+            for task, stock_result in stock_results.items():
+                if stock_result is not None:
+                    self.stocks_results.setdefault(task, {})[stock] = stock_result
+
+    def work_summaries_busy_days(self, stock, stock_aggregates, summaries, months_aggregates):
+        """Summaries mode: busy days of a stock, looked for only within months
+        whose highest volume is busy.
+
+        :param stock: Stock symbol
+        :param stock_aggregates: StockAggregates: merged over whole range
+        :param summaries: dict: month to StockAggregates summary
+        :param months_aggregates: dict: month to StockAggregates, with days for months without summary
+        :return: list of busy days
+        """
+        volume_mean = stock_aggregates.volume_mean
+        if volume_mean is None:
+            return []
+
+        busy_months = [
+            [month] + month_interval(month) for month, summary in summaries.items()
+            if summary.volume_max is not None and volume_busy(summary.volume_max, volume_mean)
+        ]
+        self.work_fetch_months({stock: busy_months})
+        self.stocks_data[stock].sort()
+
+        busy = []
+        for month in sorted(months_aggregates):
+            month_aggregates = months_aggregates[month]
+            if month in summaries:
+                if not any(busy_month[0] == month for busy_month in busy_months):
+                    continue
+                month_start, month_end = month_interval(month)
+                month_days = self.stock_days(stock, month_start, month_end)
+                days, volumes = month_days.get("Date", []), month_days.get("Volume", [])
+            else:
+                days, volumes = month_aggregates.days, month_aggregates.volumes
+            busy += busy_days(days, volumes, volume_mean)
+
+        return busy
+
+    def work_rollup(self):
+        """Rollup mode: average monthly Open and Close looked up from per-symbol
+        monthly rollups for months fully within date range and cached, rather
+        than computed over every day.
+
+        Day data is only loaded for partial edge months and months without
+        rollup row (whose row is then stored).
+        """
+        start, end = self.interval
+        months = months_within(start, end)
+
+        self.cache_index.prefetch(self.stocks, ROLLUP_COLUMNS)
+        self.stocks_rollups_get(self.stocks)
+
+        stocks_rollup_months = {}
+        stocks_day_months = {}
+        for stock in self.stocks:
+            cached_intervals = self.cache_index.get_columns(stock, ROLLUP_COLUMNS)
+            stock_rollup = self.stocks_rollups[stock]
+            stocks_rollup_months[stock] = []
+            stocks_day_months[stock] = []
+            for month, month_start, month_end in months:
+                full_month = [month_start, month_end] == month_interval(month)
+                if full_month and month in stock_rollup and \
+                        not intervals_subtract(month_start, month_end, cached_intervals):
+                    stocks_rollup_months[stock].append(month)
+                else:
+                    stocks_day_months[stock].append([month, month_start, month_end])
+
+        self.logger.debug("rollup: months: {}, rollup rows: {}".format(
+            len(months) * len(self.stocks), sum(len(months) for months in stocks_rollup_months.values())
+        ))
+        self.work_fetch_months(stocks_day_months)
+
+        for stock in self.stocks:
+            self.stocks_data[stock].sort()
+
+            cached_intervals = self.cache_index.get_columns(stock, ROLLUP_COLUMNS)
+            stock_rollup = self.stocks_rollups[stock].select(stocks_rollup_months[stock])
+            for month, month_start, month_end in stocks_day_months[stock]:
+                month_days = self.stock_days(stock, month_start, month_end)
+                stock_rollup.update(month, month_days)
+
+                if [month_start, month_end] == month_interval(month) and month not in self.stocks_rollups[stock] and \
+                        not intervals_subtract(month_start, month_end, cached_intervals):
+                    # Month cached before rollups were stored
+                    self.stocks_rollups[stock].update(month, month_days)
+                    self.stocks_rollups_changed.add(stock)
+
+            self.stocks_results.setdefault(StockInvestorTask.AVERAGE_MONTHLY_OPEN_CLOSE, {})[stock] = \
+                stock_rollup.averages()
+
+        self.stocks_rollups_put()
+
+    def stocks_rollups_get(self, stocks):
+        """Load monthly rollups of stocks not loaded yet, from cache.
+
+        :param stocks: list: stock symbols
+        """
+        stocks = [stock for stock in stocks if stock not in self.stocks_rollups]
+        if not stocks:
+            return
+
+        found = self.cache.get_multi(
+            [stock_cache_key(stock, "rollup") for stock in stocks], cache_group_name="rollup"
+        )
+        for stock in stocks:
+            rollup = found.get(stock_cache_key(stock, "rollup"))
+            self.stocks_rollups[stock] = StockMonthlyRollup.from_dict(rollup) if rollup else StockMonthlyRollup()
+
+    def stocks_rollups_put(self):
+        """Store monthly rollups changed since loaded."""
+        for stock in sorted(self.stocks_rollups_changed):
+            self.cache.put(
+                cache_key=stock_cache_key(stock, "rollup"),
+                cache_value=self.stocks_rollups[stock].to_dict(),
+                cache_group_name="rollup"
+            )
+        self.stocks_rollups_changed = set()
+
+    def work_fetch_months(self, stocks_months):
+        """Load day data of months into stocks data, from cache or fetched.
+
+        :param stocks_months: dict: stock to list of ['YYYY-MM', start, end]
+        """
+        self.worker_queue = queue.Queue()
+        for stock, months in stocks_months.items():
+            for _, month_start, month_end in months:
+                self.worker_queue.put(
+                    StockInvestorRequest(
+                        api_key=self.api_key,
+                        stock=stock,
+                        start_date=ordinal_to_date(month_start),
+                        end_date=ordinal_to_date(month_end)
+                    )
+                )
+
+        if not self.worker_queue.empty():
+            self.work_fetch()
+
+    def stock_days(self, stock, start, end):
+        """Column arrays of a stock collected data within [start, end] date ordinals, data being sorted."""
+        stock_data = self.stocks_data[stock]
+        if not len(stock_data):
+            return {}
+
+        days = stock_data.days
+        first = int(np.searchsorted(days, start - EPOCH_ORDINAL, side="left"))
+        last = int(np.searchsorted(days, end - EPOCH_ORDINAL, side="right"))
+        return {column: array[first:last] for column, array in stock_data.to_dict().items()}
+
+    def work_fetch(self):
+        """Fetch all requests within worker queue using the selected engine.
+
+        In stream mode, stocks are planned, fetched and emitted a window of
+        _STREAM_WINDOW_STOCKS stocks at a time: peak memory is the history of
+        a window of stocks, whatever the number of stocks and cached months.
+        """
+        if not self.stream:
+            self.work_fetch_window()
+            return
+
+        stock_wreqs = self.worker_queue_stocks()
+        stocks = list(stock_wreqs)
+        for first in range(0, len(stocks), self._STREAM_WINDOW_STOCKS):
+            for stock in stocks[first:first + self._STREAM_WINDOW_STOCKS]:
+                for wreq in stock_wreqs.pop(stock):
+                    self.worker_queue.put(wreq)
+            self.work_fetch_window()
+
+    def work_fetch_window(self):
+        """Plan and fetch all requests within worker queue, see work_fetch()."""
+        self.worker_queue_plan()
+        self.quota_get()
+
+        # No request when every month-slice is served from cache: the HTTP stack is then not even imported.
+        self.fetch_requests += self.worker_queue.qsize()
+        if not self.worker_queue.empty():
+            if self.engine == StockInvestorEngine.ASYNCIO:
+                self.work_fetch_asyncio()
+            else:
+                self.work_fetch_threads()
+        self.quota_put()
+        self.stocks_rollups_put()
+
+        if self.stream:
+            # Stocks having requests without response are emitted with data collected.
+            for stock in [stock for stock, pending in self.stocks_pending.items() if pending]:
+                self.logger.warning("stream: incomplete: {}".format(stock))
+                self.work_stream_emit(stock)
+
+    def work_stream_emit(self, stock):
+        """Stream mode: once all requests of a stock completed, compute tasks over
+        its data alone, hand its results to on_stock_results, and release its data.
+
+        :param stock: Stock symbol
+        """
+        self.stocks_pending.pop(stock, None)
+
+        results = StockInvestorAnalytics(self.stock_frame(stock, stock_category=True), [stock]).run(self.tasks)
+        stock_results = {task: result.get(stock) for task, result in results.items()}
+        for task, stock_result in stock_results.items():
+            if stock_result is not None:
+                self.stocks_results.setdefault(task, {})[stock] = stock_result
+
+        if self.on_stock_results:
+            self.on_stock_results(stock, stock_results)
+
+        self.stocks_data[stock] = StockPriceStore()
+        for data_cache_key in self.stocks_cache_keys.pop(stock, []):
+            self.cached_months.pop(data_cache_key, None)
+
+    def work_stocks_results(self):
+        """Stream, incremental and summaries modes: results computed stock by stock, keyed by
+        task then stock as returned by work_tasks(), the biggest loser being chosen
+        across stocks.
+
+        :return: dict: task to its result
+        """
+        results = {}
+        for task in self.tasks:
+            task_results = self.stocks_results.get(task, {})
+            task_results = {stock: task_results[stock] for stock in self.stocks if stock in task_results}
+            results[task] = biggest_loser(task_results) if task == StockInvestorTask.BIGGEST_LOSER else task_results
+
+        return results
+
+    def work_fetch_threads(self):
+        """Fetch scheduler: a single producer/consumer loop over the worker queue.
+
+        The producer drains the planned worker queue, submitting requests to
+        the executor while keeping at most _MAX_WORKERS requests in flight. The consumer waits upon the first
+        completed future, merging each StockInvestorResponse exactly once into
+        stocks_data from this single thread.
+        """
+        num_worker_threads = self._MAX_WORKERS
+        in_flight = set()
+
+        # Requests handler and its pooled session, shared by all workers: created before any of them starts.
+        self.base_request
+
+        with futures.ThreadPoolExecutor(max_workers=num_worker_threads) as executor:
+            while in_flight or not self.worker_queue.empty():
+                # Producer: top up in-flight requests
+                while len(in_flight) < num_worker_threads and not self.worker_queue.empty():
+                    wreq = self.worker_queue.get()
+                    in_flight.add(executor.submit(self.work_process, wreq))
+
+                if not in_flight:
+                    continue
+
+                # Consumer: handle each completed request once
+                done, in_flight = futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    wresp = future.result()
+                    if not wresp:
+                        self.logger.warning("No response")
                         continue
 
-                    assert data_cache_key == wreq.cache_key(cache_group_name="data")
-                    assert columns_cache_key == wreq.cache_key(cache_group_name="columns")
+                    self.work_response(wresp)
+
+        self.logger.debug("Session: Metrics", extra=self.session.metrics())
+
+    def work_fetch_asyncio(self):
+        """Fetch all requests within worker queue through a single asyncio event loop.
 
-                    self.logger.debug("cache: miss: {}".format(wreq))
-                    future = executor.submit(self.work_process, wreq)
-                    threads.append(future)
+        Requests are handed to StockInvestorAsyncFetch, and each completed
+        response is merged and cached from the event loop thread.
+        """
+        from stock_investing.async_fetch import StockInvestorAsyncFetch
 
-                    for future in futures.as_completed(threads):
-                        wresp = future.result()
-                        if not wresp:
-                            self.logger.warning("No response")
-                            continue
+        wreqs = []
+        while not self.worker_queue.empty():
+            wreqs.append(self.worker_queue.get())
 
-                        self.stocks_data[wresp.stock]["columns"] = wresp.columns
-                        self.stocks_data[wresp.stock]["data"] += wresp.data
+        if not wreqs:
+            return
 
-                        self.logger.debug("cache: pre-set: {}".format(wresp.str))
+        async_fetch = StockInvestorAsyncFetch(
+            api_key=self.api_key,
+            process_response=self.work_process_response,
+            concurrency=self.concurrency,
+            rate_limiter=self.rate_limiter,
+            logger=self.logger
+        )
+        async_fetch.run(wreqs, self.work_response)
 
-                        data_cache_key = wresp.cache_key(cache_group_name="data")
-                        self.cache.put(cache_key=data_cache_key, cache_value=wresp.data)
+    def cache_months_decode(self, cache_values):
+        """Decode cached symbol-month entries; an entry not decodable (e.g. earlier
+        cache format) is dropped, so that its month is fetched again.
 
-                        columns_cache_key = wresp.cache_key(cache_group_name="columns")
-                        self.cache.put(columns_cache_key, wresp.columns)
+        :param cache_values: dict: cache key to encoded symbol-month entry
+        :return: dict: cache key to StockPriceStore
+        """
+        cached_months = {}
+        for cache_key, cache_value in cache_values.items():
+            try:
+                columns, arrays = codec.decode(cache_value)
+            except (codec.CodecError, TypeError) as ex:
+                self.logger.warning(
+                    "cache: decode: failed",
+                    extra={'cache_key': cache_key, 'error': get_exception_message(ex)}
+                )
+                continue
 
-                        if not self.__worker_queue.empty():
-                            wreq = self.__worker_queue.get()
-                            future = executor.submit(self.work_process, wreq)
-                            threads.append(future)
+            cached_month = StockPriceStore(columns)
+            cached_month.append_arrays(arrays)
+            cached_months[cache_key] = cached_month
 
-            self.stock_dataframe()
+        return cached_months
 
-            if self.task == StockInvestorTask.AVERAGE_MONTHLY_OPEN_CLOSE:
-                result = self.task_average_monthly_open_close()
-            elif self.task == StockInvestorTask.MAX_DAILY_PROFIT:
-                result = self.task_max_daily_profit()
-            elif self.task == StockInvestorTask.BUSY_DAY:
-                result = self.task_busy_day()
-            elif self.task == StockInvestorTask.BIGGEST_LOSER:
-                result = self.task_biggest_loser()
+    def work_cache_serve(self, wreq, cached_month):
+        """Serve a month-slice request by slicing its cached symbol-month entry.
 
-        except Exception as ex:
-            self.logger.error(
-                'Worker: Failed: Unexpected Error',
-                extra={'error_exception': base_class_name(ex),
-                       'error_details': get_exception_message(ex)})
-            raise
+        :param wreq: StockInvestorRequest
+        :param cached_month: StockPriceStore: cached rows of month
+        """
+        self.logger.debug("cache: hit: {}".format(wreq.str))
 
-        return result
+        start_day, end_day = dates_to_days([wreq.start_date, wreq.end_date])
+        days = cached_month.days
+        within = (days >= start_day) & (days <= end_day)
+
+        self.stocks_data[wreq.stock].append_arrays(
+            {column: array[within] for column, array in cached_month.to_dict().items()}
+        )
+
+    def work_cache_put(self, wresp):
+        """Merge fetched month response into its cached symbol-month entry,
+        stored encoded by stock_investing.codec.
+
+        :param wresp: StockInvestorResponse, within a single month
+        """
+        self.logger.debug("cache: pre-set: {}".format(wresp.str))
+
+        data_cache_key = wresp.cache_key(cache_group_name="data")
+        cached_month = self.cached_months.get(data_cache_key) or StockPriceStore()
+
+        # Fetched values replace cached ones upon duplicated dates, column-projected ones for their column alone.
+        cached_month.update_arrays(wresp.arrays)
+
+        self.cached_months[data_cache_key] = cached_month
+        self.cache.put(
+            cache_key=data_cache_key,
+            cache_value=codec.encode(cached_month.columns, cached_month.to_dict()),
+            cache_group_name="data"
+        )
+        if wresp.column is None:
+            self.work_summary_put(wresp.stock, wresp.month, cached_month.to_dict())
+        if any(column in ROLLUP_COLUMNS for column in wresp.columns):
+            self.work_rollup_update(wresp.stock, wresp.month, cached_month.to_dict())
+
+    def work_summary_put(self, stock, month, arrays):
+        """Store symbol-month summary alongside its cached symbol-month entry.
+
+        :param stock: Stock symbol
+        :param month: 'YYYY-MM'
+        :param arrays: dict: column arrays of cached rows of month
+        """
+        self.cache.put(
+            cache_key=month_cache_key(stock, month, "summary"),
+            cache_value=month_summary(month, arrays).to_dict(),
+            cache_group_name="summary"
+        )
+
+    def work_rollup_update(self, stock, month, arrays):
+        """Replace month's row of the stock's monthly rollup, stored once fetching completes.
+
+        :param stock: Stock symbol
+        :param month: 'YYYY-MM'
+        :param arrays: dict: column arrays of cached rows of month
+        """
+        self.stocks_rollups_get([stock])
+        self.stocks_rollups[stock].update(month, arrays)
+        self.stocks_rollups_changed.add(stock)
+
+    def work_response(self, wresp):
+        """Consume a fetched response: merge into stocks data, cache by month,
+        and record its range within the cache index.
+
+        :param wresp: StockInvestorResponse
+        """
+        self.work_merge(wresp)
+
+        # Columns are stored once per symbol rather than once per month, as fetched so far.
+        stock_columns = self.stocks_columns.get(wresp.stock) or []
+        if any(column not in stock_columns for column in wresp.columns):
+            stock_columns = stock_columns + [column for column in wresp.columns if column not in stock_columns]
+            self.stocks_columns[wresp.stock] = stock_columns
+            self.cache.put(
+                cache_key=stock_cache_key(wresp.stock, "columns"), cache_value=stock_columns, cache_group_name="columns"
+            )
+
+        for wresp_month in wresp.split():
+            self.work_cache_put(wresp_month)
+
+        start, end = wresp.interval
+        self.cache_index.add(wresp.stock, start, end, wresp.column)
+
+        if self.stream:
+            self.stocks_pending[wresp.stock] -= 1
+            if not self.stocks_pending[wresp.stock]:
+                self.work_stream_emit(wresp.stock)
+
+    def work_merge(self, wresp):
+        """Merge fetched response into collected stocks data.
+
+        :param wresp: StockInvestorResponse
+        """
+        if wresp.column is None:
+            self.stocks_data[wresp.stock].append_arrays(wresp.arrays)
+        else:
+            self.stocks_data[wresp.stock].update_arrays(wresp.arrays)
 
     def work_process(self, wreq):
         """Processes a single request to QUANDL WIKI API
@@ -394,14 +1337,9 @@ class StockInvestor(object):
         :param wreq: StockInvestorRequest
         :return: StockInvestorResponse
         """
-        self.logger.debug("Process: {}".format(wreq))
+        from pyfortified_requests.support import HEADER_CONTENT_TYPE_APP_JSON
 
-        request_params = {
-            "start_date": wreq.start_date,
-            "end_date": wreq.end_date,
-            "api_key": self.api_key,
-            "order": "asc",
-        }
+        self.logger.debug("Process: {}".format(wreq))
 
         request_url = URL_QUANDL_WIKI_TMPL.format(wreq.stock)
         try:
@@ -409,8 +1347,8 @@ class StockInvestor(object):
                 request_method="GET",
                 request_url=request_url,
                 request_headers=HEADER_CONTENT_TYPE_APP_JSON,
-                request_params=request_params,
-                request_label="{0}:{1}:{2}".format(wreq.stock, wreq.start_date, wreq.end_date)
+                request_params=wreq.request_params,
+                request_label=wreq.request_label
             )
         except Exception:
             return None
@@ -418,14 +1356,20 @@ class StockInvestor(object):
         if response is None:
             return None
 
-        status_code = response.status_code
+        return self.work_process_response(wreq, response.status_code, response.content)
+
+    def work_process_response(self, wreq, status_code, content):
+        """Parse a QUANDL WIKI API response body
+
+        :param wreq: StockInvestorRequest
+        :param status_code: HTTP status code
+        :param content: bytes: Response body
+        :return: StockInvestorResponse
+        """
         if status_code != 200:
             return None
 
-        json_data = json.loads(response.text)
-
-        dataset_columns = json_data['dataset_data']['column_names']
-        dataset_data = json_data['dataset_data']['data']
+        dataset_columns, dataset_arrays = decode_dataset_data(content)
 
         wresp = StockInvestorResponse(
             api_key=self.api_key,
@@ -433,7 +1377,8 @@ class StockInvestor(object):
             start_date=wreq.start_date,
             end_date=wreq.end_date,
             columns=dataset_columns,
-            data=dataset_data
+            arrays=dataset_arrays,
+            column=wreq.column
         )
 
         return wresp
@@ -458,6 +1403,10 @@ class StockInvestor(object):
         :param request_label:
         :return:
         """
+        import requests
+        from pyhttpstatus_utils import HttpStatusCode
+        from pyfortified_requests.exceptions import RequestsFortifiedClientError
+
         request_data_decoded = None
         if request_data:
             request_data_decoded = urldecode(request_data)
@@ -481,6 +1430,8 @@ class StockInvestor(object):
                 _request_label = request_label
 
             try:
+                self.rate_limiter.quota_check()
+
                 response = self.base_request.request(
                     request_method=request_method,
                     request_url=request_url,
@@ -493,16 +1444,38 @@ class StockInvestor(object):
                     request_headers=request_headers,
                     request_label=_request_label
                 )
-            except requests.exceptions.RetryError as ex:
-                self.logger.warning(
-                    "Request Retry",
+            except (requests.exceptions.RetryError, RequestsFortifiedClientError) as ex:
+                throttled = isinstance(ex, requests.exceptions.RetryError) or \
+                    ex.error_code == HttpStatusCode.TOO_MANY_REQUESTS
+                if throttled and tries < self._MAX_REQUEST_TRIES:
+                    # Next attempt is paced by the rate limiter, which was told of throttling.
+                    self.logger.warning(
+                        "Request Retry",
+                        extra={
+                            "request_url": request_url,
+                            "error": get_exception_message(ex)
+                        }
+                    )
+                    continue
+
+                self.logger.error(
+                    "Request Error",
                     extra={
                         "request_url": request_url,
                         "error": get_exception_message(ex)
                     }
                 )
-                time.sleep(1)  # Sleep 1 second before retry.
-                continue
+                raise
+
+            except RateLimitQuotaExceeded as ex:
+                self.logger.error(
+                    "Request Quota Exceeded",
+                    extra={
+                        "request_url": request_url,
+                        "error": get_exception_message(ex)
+                    }
+                )
+                raise
 
             except Exception as ex:
                 self.logger.error(
@@ -518,152 +1491,85 @@ class StockInvestor(object):
 
     def stock_dataframe(self):
         """Build Pandas Dataframe from cached collected data."""
-        self.logger.debug("Data", extra = self.stocks_data )
+        self.logger.debug("Data", extra={stock: len(stock_data) for stock, stock_data in self.stocks_data.items()})
 
-        self.df = None
-        for stock, stock_data in self.stocks_data.items():
-            dataset_columns = ["Stock"] + stock_data["columns"]
-            dataset_data = [[stock] + i for i in stock_data["data"]]
-
-            if self.df is None:
-                self.df = pd.DataFrame(columns=dataset_columns)
-            stocks = json.loads(json.dumps([dict(zip(dataset_columns, i)) for i in dataset_data]))
-            self.df = self.df.append(stocks, ignore_index=False)
-
-        self.df = self.df.sort_values(by=["Stock", "Date"])
+        pd = pandas_import()
 
-    def task_average_monthly_open_close(self):
-        """Average Monthly Open and Close"""
-        average_monthly_open_close = {}
+        frames = []
+        lengths = []
         for stock in self.stocks:
-            average_monthly_open_close_stock = self.task_average_monthly_open_close_by_stock(stock)
-            average_monthly_open_close.update(average_monthly_open_close_stock)
-
-        return average_monthly_open_close
-
-    def task_average_monthly_open_close_by_stock(self, stock):
-        """Average Monthly Open and Close by Stock"""
-        df = self.df.copy()
-
-        criteria_stock = (df['Stock'] == stock)
-        df_stock = df.copy()[criteria_stock]
-
-        df_stock['YearMonth'] = pd.to_datetime(df_stock['Date']).map(lambda dt: dt.strftime("%Y-%m"))
-        df_mean = df_stock.groupby(['Stock', 'YearMonth'], as_index=False)['Open', 'Close'].mean()
+            frame = self.stock_frame(stock)
+            frames.append(frame)
+            lengths.append(len(frame))
 
-        average_monthly_open_close = {}
-        average_monthly_open_close[stock] = []
+        # One concatenation, Stock as categorical codes rather than repeated strings.
+        df = pd.concat(frames, ignore_index=True, sort=False)
+        stock_codes = np.repeat(np.arange(len(self.stocks)), lengths)
+        df.insert(0, "Stock", pd.Categorical.from_codes(stock_codes, categories=self.stocks))
 
-        for key, month in df_mean['YearMonth'].items():
-            average_open = df_mean['Open'][key]
-            average_close = df_mean['Close'][key]
+        self.df = df
 
-            average_entry = {
-                'month': month,
-                'average_open': round(average_open, 2),
-                'average_close': round(average_close, 2)
-            }
-            average_monthly_open_close[stock] += [average_entry]
+    def stock_frame(self, stock, stock_category=False):
+        """Pandas Dataframe of a stock collected data, ordered by Date.
 
-        return average_monthly_open_close
+        :param stock: Stock symbol
+        :param stock_category: Insert Stock column, as categorical of this stock alone.
+        """
+        stock_data = self.stocks_data[stock]
+        if not stock_data.columns:
+            # Nothing collected: empty WIKI columns
+            stock_data = StockPriceStore(list(WIKI_COLUMN_DTYPES))
+        stock_data.sort()
 
-    def task_max_daily_profit(self):
-        df = self.df.copy()
+        pd = pandas_import()
+        frame = pd.DataFrame(stock_data.to_dict(), copy=False)
+        frame["Date"] = pd.to_datetime(stock_data.days, unit="D")
 
-        df['Profit'] = df['High'] - df['Low']
+        if stock_category:
+            stock_codes = np.zeros(len(frame), dtype=np.int64)
+            frame.insert(0, "Stock", pd.Categorical.from_codes(stock_codes, categories=[stock]))
 
-        max_daily_profit = {}
-        for stock in self.stocks:
-            max_daily_profit.update(self.task_max_daily_profit_by_stock(df, stock))
+        return frame
 
-        return max_daily_profit
+    def work_tasks(self, tasks):
+        """Compute requested tasks together over assembled Dataframe, or directly
+        over memory-mapped dataset arrays when a dataset is opened, or over
+        collected arrays when no Dataframe was assembled (served from cache alone).
 
-    def task_max_daily_profit_by_stock(self, df, stock):
-        df = copy.copy(df)
+        :param tasks: list of StockInvestorTask
+        :return: dict: task to its result
+        """
+        if self.dataset is not None:
+            start, end = self.interval
+            return StockInvestorArrayAnalytics(self.dataset.slices(self.stocks, start, end), self.stocks).run(tasks)
 
-        max_daily_profit = {}
-        max_daily_profit[stock] = {}
+        if self.df is None:
+            start, end = self.interval
+            for stock_data in self.stocks_data.values():
+                stock_data.sort()
+            stocks_days = {stock: self.stock_days(stock, start, end) for stock in self.stocks}
+            return StockInvestorArrayAnalytics(stocks_days, self.stocks).run(tasks)
 
-        criteria_stock = (df['Stock'] == stock)
-        df_stock = df.copy()[criteria_stock]
+        return StockInvestorAnalytics(self.df, self.stocks).run(tasks)
 
-        max_daily_profit[stock] = json.loads(df_stock.ix[df_stock['Profit'].idxmax()][['Date', 'Profit']].to_json())
+    def task_average_monthly_open_close(self):
+        """Average Monthly Open and Close"""
+        return self.work_tasks([StockInvestorTask.AVERAGE_MONTHLY_OPEN_CLOSE])[StockInvestorTask.AVERAGE_MONTHLY_OPEN_CLOSE]
 
-        return max_daily_profit
+    def task_max_daily_profit(self):
+        """Which day provided the highest amount of profit"""
+        return self.work_tasks([StockInvestorTask.MAX_DAILY_PROFIT])[StockInvestorTask.MAX_DAILY_PROFIT]
 
     def task_busy_day(self):
         # We’d like to know which days generated unusually high activity for our securities.
         # Please display the ticker symbol, date, and volume for each day where the volume was more than 10% higher
         # than the security’s average volume (Note: You’ll need to calculate the average volume, and should display
         # that somewhere too).
-
-        busy_day = {}
-        for stock in self.stocks:
-            busy_day.update(self.task_busy_day_by_stock(stock))
-
-        return busy_day
-
-    def task_busy_day_by_stock(self, stock):
-        df = self.df.copy()
-
-        criteria_stock = (df['Stock'] == stock)
-        # criteria_row_indices = df[criteria_stock].index
-        # df_stock = df.copy().loc[criteria_row_indices, :]
-        df_stock = df.copy()[criteria_stock]
-
-        df_stock['Volume Mean'] = df_stock['Volume'].mean()
-
-        dfColumnVolumeHigh = ((df_stock['Volume'] - df_stock['Volume Mean'])/ df_stock['Volume Mean']) * 100
-        df_stock['Volume High'] = dfColumnVolumeHigh
-        stock_slice_VH = df_stock['Volume High'] > 10
-
-        df_slice_json = json.loads(df_stock[stock_slice_VH][['Stock', 'Date', 'Volume', 'Volume Mean']].to_json())
-        busy_day = {}
-        busy_day[stock] = []
-
-        for key, date in df_slice_json['Date'].items():
-            volume = df_slice_json['Volume'][key]
-            volume_mean = df_slice_json['Volume Mean'][key]
-
-            volume_entry = {
-                'date': date,
-                'volume': int(volume),
-                'volume_mean': int(volume_mean)
-            }
-            busy_day[stock] += [volume_entry]
-
-        # pprint(df_stock[['Stock', 'Date', 'Volume', 'Volume Mean', 'Volume High']])
-
-        return busy_day
+        return self.work_tasks([StockInvestorTask.BUSY_DAY])[StockInvestorTask.BUSY_DAY]
 
     def task_biggest_loser(self):
-        biggest_losers = {}
-        for stock in self.stocks:
-            biggest_losers.update(self.task_biggest_loser_by_stock(stock))
-
-        biggest_loser = None
-        for vstock, vnumber_of_lose_days in biggest_losers.items():
-            if not biggest_loser:
-                biggest_loser = {vstock: vnumber_of_lose_days}
-                continue
-
-            stock = list(biggest_loser.keys())[0]
-            number_of_lose_days = biggest_loser[stock]
-
-            if vnumber_of_lose_days > number_of_lose_days:
-                biggest_loser = {vstock: vnumber_of_lose_days}
-
-        return biggest_loser
-
-    def task_biggest_loser_by_stock(self, stock):
-        pd.set_option('display.float_format', lambda x: '%.4f' % x)
-
-        df = self.df.copy()
-        criteria_stock = (df['Stock'] == stock)
-        df_slice = df[criteria_stock]
-        number_of_lose_days = df_slice[(df_slice['Close'] < df_slice['Open'])].count()[1]
-
-        return {stock: number_of_lose_days}
+        """Which stock had the most days where the closing price was lower than the opening price"""
+        return self.work_tasks([StockInvestorTask.BIGGEST_LOSER])[StockInvestorTask.BIGGEST_LOSER]
 
 
 def main():
@@ -673,13 +1579,31 @@ def main():
 
     stock_symbols_default = ["COF", "GOOGL", "MSFT"]
 
-    usage = ("""Usage: {0} 
+    def usage():
+        # Formatted only when printed: server defaults are imported then.
+        from stock_investing.server import (StockInvestorServer, ADDRESS_DEFAULT)
+
+        return ("""Usage: {0} 
         [-v | --verbose] 
         [-h | --help] 
         --api-key='API-KEY' 
        [--stocks=Stock,Stock,Stock]
        [--start-date='YYYY-MM-DD'] 
        [--end-date='YYYY-MM-DD'] 
+       [--engine=threads|asyncio]
+       [--concurrency=N]
+       [--rate-limit=N]
+       [--daily-quota=N]
+       [--tasks=Task,Task,Task]
+       [--cache-dir=PATH]
+       [--import-wiki-csv=PATH]
+       [--dataset=PATH]
+       [--export-parquet=PATH | --from-parquet=PATH]
+       [--stream]
+       [--incremental]
+       [--summaries]
+       [--serve [--listen=HOST:PORT | --socket=PATH] [--refresh=SECONDS]]
+       [--batch=PATH [--batch-output=PATH]]
        [--help | --avg-monthly-open-close | --max-daily-profit | --busy-day | --biggest-loser]
     -v | --verbose: Provide verbose details
     -h | --help: Usage
@@ -687,21 +1611,52 @@ def main():
     --start-date: 'YYYY-MM-DD' Default: '{1}'
     --end-date: 'YYYY-MM-DD' Default: '{2}'
     --stocks: List of WIKI Stock Symbols [Required] Default: {3}
+    --engine: Fetch engine: 'threads' (ThreadPoolExecutor) or 'asyncio' (single event loop). Default: 'threads'
+    --concurrency: Maximum in-flight requests for 'asyncio' engine. Default: 100
+    --rate-limit: Initial requests per second, adapted upon throttling (TOO_MANY_REQUESTS). Default: 20
+    --daily-quota: Maximum requests per UTC day, counted across runs. Default: unlimited
+    --tasks: Compute several tasks in one pass, results keyed by task: {4}
+    --cache-dir: Local on-disk cache tier, consulted before memcached; '' to disable. Default: '{5}'
+    --import-wiki-csv: Backfill cache from a local WIKI_PRICES CSV export (plain or gzipped), then exit.
+        Limited to --stocks when provided. --api-key is not required.
+    --dataset: Memory-mapped columnar dataset; tasks run over it directly when it covers --stocks and dates,
+        otherwise fetched data is merged into it.
+    --export-parquet: Write assembled price table as Parquet dataset partitioned by Stock/Year.
+    --from-parquet: Load price table from Parquet dataset instead of fetching, only needed columns and partitions.
+    --stream: Emit results of each stock as soon as its data is fetched or served from cache, few stocks in memory.
+    --incremental: Fetch only days after each stock's last aggregated day, answering from persisted aggregates.
+    --summaries: Answer by merging cached symbol-month summaries plus edge days, rather than every day of range.
+    --serve: Keep data of --stocks and dates resident, answering task queries over a local HTTP API until interrupted:
+        GET /<task>?stocks=A,B&start-date=YYYY-MM-DD&end-date=YYYY-MM-DD, GET /tasks?tasks=Task,Task&..., GET /status
+    --listen: Serve HTTP on HOST:PORT. Default: '{6}'
+    --socket: Serve HTTP on a Unix socket at PATH, instead of --listen.
+    --refresh: Seconds between background refreshes of resident data, 0 to disable;
+        an --end-date beyond yesterday follows the current date. Default: {7}
+    --batch: Answer a JSONL file of jobs in one process, fetches of all jobs planned together, one JSON object per
+        line: {{"id": ..., "stocks": [...], "start-date": ..., "end-date": ..., "task": ... | "tasks": [...]}},
+        omitted fields taken from the above options. Results are written as JSONL in job order.
+    --batch-output: Write batch results to PATH. Default: standard output
     --avg-monthly-open-close: Average Monthly Open and Close prices for each stock. Default.
     --max-daily-profit: Which day provided the highest amount of profit for each stock.
     --busy-day: Which days generated unusually high activity for each stock.
     --biggest-loser: Which stock had the most days where the closing price was lower than the opening price.
-    """).format(sys.argv[0], yesterday_date_default, yesterday_date_default, str(stock_symbols_default))
+    """).format(
+            sys.argv[0], yesterday_date_default, yesterday_date_default, str(stock_symbols_default),
+            ",".join(StockInvestorTask.all()), CACHE_DIR_DEFAULT, ADDRESS_DEFAULT, StockInvestorServer._REFRESH_SECS)
 
     try:
         opts, args = getopt.getopt(
             sys.argv[1:],
             "hv",
-            ["help", "verbose", "api-key=", "stocks=", "start-date=", "end-date=", "avg-monthly-open-close", "max-daily-profit", "busy-day", "biggest-loser"])
+            ["help", "verbose", "api-key=", "stocks=", "start-date=", "end-date=",
+             "engine=", "concurrency=", "rate-limit=", "daily-quota=", "tasks=", "cache-dir=", "import-wiki-csv=", "dataset=",
+             "export-parquet=", "from-parquet=", "stream", "incremental", "summaries",
+             "serve", "listen=", "socket=", "refresh=", "batch=", "batch-output=",
+             "avg-monthly-open-close", "max-daily-profit", "busy-day", "biggest-loser"])
     except getopt.GetoptError as err:
         # print help information and exit:
         print(err) # will print something like "option -a not recognized"
-        print(usage)
+        print(usage())
         sys.exit(1)
 
     kv = {}
@@ -709,7 +1664,7 @@ def main():
         if opt in ("-v", "--verbose"):
             kv["verbose"] = True
         elif opt in ("-h", "--help"):
-            print(usage)
+            print(usage())
             sys.exit(0)
         elif opt in ("--api-key"):
             kv["api-key"] = val
@@ -719,6 +1674,77 @@ def main():
             kv["end-date"] = val
         elif opt in ("--stocks"):
             kv["stocks"] = val.split(",")
+        elif opt in ("--engine"):
+            if not StockInvestorEngine.validate(val):
+                print("{}: Invalid --engine={}".format(sys.argv[0], val))
+                print(usage())
+                sys.exit(1)
+            kv["engine"] = val
+        elif opt in ("--concurrency"):
+            try:
+                kv["concurrency"] = int(val)
+            except ValueError as ex:
+                print(ex)
+                print("{}: Invalid --concurrency={}".format(sys.argv[0], val))
+                print(usage())
+                sys.exit(1)
+        elif opt in ("--rate-limit"):
+            try:
+                kv["rate-limit"] = float(val)
+            except ValueError as ex:
+                print(ex)
+                print("{}: Invalid --rate-limit={}".format(sys.argv[0], val))
+                print(usage())
+                sys.exit(1)
+        elif opt in ("--daily-quota"):
+            try:
+                kv["daily-quota"] = int(val)
+            except ValueError as ex:
+                print(ex)
+                print("{}: Invalid --daily-quota={}".format(sys.argv[0], val))
+                print(usage())
+                sys.exit(1)
+        elif opt in ("--tasks"):
+            kv["tasks"] = val.split(",")
+            for task in kv["tasks"]:
+                if not StockInvestorTask.validate(task):
+                    print("{}: Invalid --tasks={}".format(sys.argv[0], val))
+                    print(usage())
+                    sys.exit(1)
+        elif opt in ("--cache-dir"):
+            kv["cache-dir"] = val or None
+        elif opt in ("--import-wiki-csv"):
+            kv["import-wiki-csv"] = val
+        elif opt in ("--dataset"):
+            kv["dataset"] = val
+        elif opt in ("--export-parquet"):
+            kv["export-parquet"] = val
+        elif opt in ("--from-parquet"):
+            kv["from-parquet"] = val
+        elif opt in ("--stream"):
+            kv["stream"] = True
+        elif opt in ("--incremental"):
+            kv["incremental"] = True
+        elif opt in ("--summaries"):
+            kv["summaries"] = True
+        elif opt in ("--serve"):
+            kv["serve"] = True
+        elif opt in ("--listen"):
+            kv["listen"] = val
+        elif opt in ("--socket"):
+            kv["socket"] = val
+        elif opt in ("--batch"):
+            kv["batch"] = val
+        elif opt in ("--batch-output"):
+            kv["batch-output"] = val
+        elif opt in ("--refresh"):
+            try:
+                kv["refresh"] = float(val)
+            except ValueError as ex:
+                print(ex)
+                print("{}: Invalid --refresh={}".format(sys.argv[0], val))
+                print(usage())
+                sys.exit(1)
         elif opt in ("--avg-monthly-open-close"):
             kv["task"] = StockInvestorTask.AVERAGE_MONTHLY_OPEN_CLOSE
         elif opt in ("--max-daily-profit"):
@@ -730,9 +1756,19 @@ def main():
         else:
             kv["task"] = StockInvestorTask.AVERAGE_MONTHLY_OPEN_CLOSE
 
+    if "import-wiki-csv" in kv:
+        from pprintpp import pprint
+        from stock_investing.bulk_import import StockInvestorBulkImport
+        bulk_import = StockInvestorBulkImport(
+            cache_dir=kv.get("cache-dir", CACHE_DIR_DEFAULT),
+            stocks=kv.get("stocks", None)
+        )
+        pprint(bulk_import.run(kv["import-wiki-csv"]))
+        sys.exit(0)
+
     if "api-key" not in kv:
         print("%s: Provide --api-key" % sys.argv[0])
-        print(usage)
+        print(usage())
         sys.exit(2)
 
     if "stocks" not in kv:
@@ -740,11 +1776,11 @@ def main():
 
     start_datetime = yesterday_datetime_default
     try:
-        start_datetime = dt.datetime.strptime(kv["start-date"], "%Y-%m-%d")
+        start_datetime = dt.datetime.strptime(kv.get("start-date", yesterday_date_default), "%Y-%m-%d")
     except ValueError as ex:
         print(ex)
         print("{}: Invalid --start-date={}".format(sys.argv[0], kv["start-date"]))
-        print(usage)
+        print(usage())
         sys.exit(1)
     except Exception:
         print(sys.stderr)
@@ -752,11 +1788,11 @@ def main():
 
     end_datetime = yesterday_datetime_default
     try:
-        end_datetime = dt.datetime.strptime(kv["end-date"], "%Y-%m-%d")
+        end_datetime = dt.datetime.strptime(kv.get("end-date", yesterday_date_default), "%Y-%m-%d")
     except ValueError as ex:
         print(ex)
         print("{}: Invalid --end-date={}".format(sys.argv[0], kv["end-date"]))
-        print(usage)
+        print(usage())
         sys.exit(1)
     except Exception:
         print(sys.stderr)
@@ -764,6 +1800,7 @@ def main():
 
     if start_datetime > end_datetime:
         start_datetime = end_datetime
+    requested_end_datetime = end_datetime
 
     if start_datetime > yesterday_datetime_default:
         start_datetime = yesterday_datetime_default
@@ -777,10 +1814,78 @@ def main():
     assert kv["start-datetime"]
     assert kv["end-datetime"]
 
+    if "batch" in kv:
+        from stock_investing.batch import StockInvestorBatch
+
+        def investor_factory(stocks, start_datetime, end_datetime, tasks):
+            batch_kv = dict(kv, stocks=stocks, task=None, tasks=tasks)
+            batch_kv.update({"start-datetime": start_datetime, "end-datetime": end_datetime})
+            return StockInvestor(batch_kv)
+
+        batch = StockInvestorBatch(
+            investor_factory,
+            defaults={
+                "stocks": kv["stocks"],
+                "start-date": start_datetime.strftime("%Y-%m-%d"),
+                "end-date": end_datetime.strftime("%Y-%m-%d"),
+                "task": kv.get("task", None),
+                "tasks": kv.get("tasks", None),
+            },
+            logger=get_logger(
+                logger_name="Stock Investor Batch",
+                logger_level=logging.DEBUG if kv.get("verbose") else logging.INFO,
+                logger_format=LoggingFormat.JSON,
+                logger_output=LoggingOutput.STDOUT_COLOR
+            )
+        )
+        if kv.get("batch-output"):
+            with open(kv["batch-output"], "wb") as batch_output:
+                batch.run(kv["batch"], batch_output)
+        else:
+            batch.run(kv["batch"], sys.stdout.buffer)
+        sys.exit(0)
+
+    if kv.get("serve"):
+        from stock_investing.server import StockInvestorServer
+
+        def investor_factory():
+            # Upon every refresh, an end date beyond yesterday follows the current date.
+            yesterday_datetime = dt.datetime.combine(dt.date.today() - dt.timedelta(days=1), dt.time())
+            serve_kv = dict(kv, task=None, tasks=StockInvestorTask.all())
+            serve_kv["end-datetime"] = max(end_datetime, min(requested_end_datetime, yesterday_datetime))
+            return StockInvestor(serve_kv)
+
+        server = StockInvestorServer(
+            investor_factory,
+            address=kv.get("listen", None),
+            socket_path=kv.get("socket", None),
+            refresh_secs=kv.get("refresh", None),
+            logger=get_logger(
+                logger_name="Stock Investor Server",
+                logger_level=logging.DEBUG if kv.get("verbose") else logging.INFO,
+                logger_format=LoggingFormat.JSON,
+                logger_output=LoggingOutput.STDOUT_COLOR
+            )
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    from pprintpp import pprint
+
     worker_class = StockInvestor(kv)
+    if worker_class.stream:
+        worker_class.on_stock_results = lambda stock, stock_results: pprint({stock: stock_results})
+
     result = worker_class.work()
 
-    pprint(result)
+    if not worker_class.stream:
+        pprint(result)
+    elif StockInvestorTask.BIGGEST_LOSER in worker_class.tasks:
+        # Per stock results already emitted; biggest loser is chosen across stocks.
+        pprint({StockInvestorTask.BIGGEST_LOSER: worker_class.work_stocks_results()[StockInvestorTask.BIGGEST_LOSER]})
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace tests
+
+import unittest
+
+from stock_investing.cache import (
+    date_to_ordinal,
+    ordinal_to_date,
+    intervals_merge,
+    intervals_intersect,
+    intervals_subtract,
+    month_interval,
+    months_within,
+)
+
+
+def interval(start_date, end_date):
+    """['YYYY-MM-DD', 'YYYY-MM-DD'] to [start, end] date ordinals"""
+    return [date_to_ordinal(start_date), date_to_ordinal(end_date)]
+
+
+class TestDateOrdinals(unittest.TestCase):
+    def test_round_trip(self):
+        for date in ["2016-02-29", "2016-12-31", "2017-01-01", "1999-12-31"]:
+            self.assertEqual(ordinal_to_date(date_to_ordinal(date)), date)
+
+    def test_consecutive_days(self):
+        self.assertEqual(date_to_ordinal("2016-03-01") - date_to_ordinal("2016-02-28"), 2)
+        self.assertEqual(date_to_ordinal("2017-03-01") - date_to_ordinal("2017-02-28"), 1)
+
+
+class TestMonths(unittest.TestCase):
+    def test_month_interval(self):
+        self.assertEqual(month_interval("2017-01"), interval("2017-01-01", "2017-01-31"))
+        self.assertEqual(month_interval("2017-04"), interval("2017-04-01", "2017-04-30"))
+        self.assertEqual(month_interval("2016-12"), interval("2016-12-01", "2016-12-31"))
+
+    def test_month_interval_february(self):
+        self.assertEqual(month_interval("2016-02"), interval("2016-02-01", "2016-02-29"))
+        self.assertEqual(month_interval("2017-02"), interval("2017-02-01", "2017-02-28"))
+        self.assertEqual(month_interval("2000-02"), interval("2000-02-01", "2000-02-29"))
+        self.assertEqual(month_interval("1900-02"), interval("1900-02-01", "1900-02-28"))
+
+    def test_months_within_one_month(self):
+        self.assertEqual(
+            months_within(*interval("2017-03-05", "2017-03-20")),
+            [["2017-03"] + interval("2017-03-05", "2017-03-20")]
+        )
+
+    def test_months_within_clipped(self):
+        self.assertEqual(months_within(*interval("2016-12-15", "2017-02-10")), [
+            ["2016-12"] + interval("2016-12-15", "2016-12-31"),
+            ["2017-01"] + interval("2017-01-01", "2017-01-31"),
+            ["2017-02"] + interval("2017-02-01", "2017-02-10"),
+        ])
+
+    def test_months_within_edges(self):
+        self.assertEqual(
+            months_within(*interval("2017-01-31", "2017-02-01")),
+            [["2017-01"] + interval("2017-01-31", "2017-01-31"), ["2017-02"] + interval("2017-02-01", "2017-02-01")]
+        )
+        self.assertEqual(months_within(*interval("2017-02-01", "2017-01-31")), [])
+
+
+class TestIntervalsMerge(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(intervals_merge([]), [])
+
+    def test_sorted(self):
+        self.assertEqual(intervals_merge([[20, 25], [1, 5]]), [[1, 5], [20, 25]])
+
+    def test_overlapping(self):
+        self.assertEqual(intervals_merge([[1, 10], [5, 15], [12, 13]]), [[1, 15]])
+
+    def test_contained(self):
+        self.assertEqual(intervals_merge([[1, 30], [10, 20]]), [[1, 30]])
+
+    def test_adjacent(self):
+        self.assertEqual(intervals_merge([[6, 10], [1, 5]]), [[1, 10]])
+
+    def test_gap_of_one_day(self):
+        self.assertEqual(intervals_merge([[1, 5], [7, 10]]), [[1, 5], [7, 10]])
+
+    def test_single_days(self):
+        self.assertEqual(intervals_merge([[3, 3], [1, 1], [2, 2]]), [[1, 3]])
+
+    def test_input_unchanged(self):
+        intervals = [[5, 15], [1, 10]]
+        intervals_merge(intervals)
+        self.assertEqual(intervals, [[5, 15], [1, 10]])
+
+    def test_month_boundaries(self):
+        self.assertEqual(
+            intervals_merge([interval("2017-02-01", "2017-02-28"), interval("2017-01-01", "2017-01-31")]),
+            [interval("2017-01-01", "2017-02-28")]
+        )
+
+
+class TestIntervalsIntersect(unittest.TestCase):
+    def test_clipped(self):
+        self.assertEqual(intervals_intersect([[1, 10], [20, 30]], 5, 25), [[5, 10], [20, 25]])
+
+    def test_disjoint(self):
+        self.assertEqual(intervals_intersect([[1, 4], [26, 30]], 5, 25), [])
+
+    def test_touching(self):
+        self.assertEqual(intervals_intersect([[1, 5], [25, 30]], 5, 25), [[5, 5], [25, 25]])
+
+
+class TestIntervalsSubtract(unittest.TestCase):
+    def test_nothing_cached(self):
+        self.assertEqual(intervals_subtract(1, 10, []), [[1, 10]])
+
+    def test_fully_cached(self):
+        self.assertEqual(intervals_subtract(5, 10, [[1, 31]]), [])
+
+    def test_exactly_cached(self):
+        self.assertEqual(intervals_subtract(5, 10, [[5, 10]]), [])
+
+    def test_hole(self):
+        self.assertEqual(intervals_subtract(1, 31, [[1, 9], [21, 31]]), [[10, 20]])
+
+    def test_edges(self):
+        self.assertEqual(intervals_subtract(1, 31, [[10, 20]]), [[1, 9], [21, 31]])
+
+    def test_outside_range(self):
+        self.assertEqual(intervals_subtract(10, 20, [[1, 5], [25, 30]]), [[10, 20]])
+
+    def test_overlapping_unsorted(self):
+        self.assertEqual(intervals_subtract(1, 31, [[15, 25], [5, 20], [28, 40]]), [[1, 4], [26, 27]])
+
+    def test_adjacent(self):
+        self.assertEqual(intervals_subtract(1, 30, [[1, 10], [11, 20], [21, 30]]), [])
+
+    def test_single_day(self):
+        self.assertEqual(intervals_subtract(7, 7, [[1, 6], [8, 10]]), [[7, 7]])
+        self.assertEqual(intervals_subtract(7, 7, [[7, 7]]), [])
+
+    def test_month_boundaries(self):
+        self.assertEqual(
+            intervals_subtract(
+                date_to_ordinal("2016-12-15"), date_to_ordinal("2017-03-15"),
+                [interval("2016-12-01", "2016-12-31"), interval("2017-02-01", "2017-02-28")]
+            ),
+            [interval("2017-01-01", "2017-01-31"), interval("2017-03-01", "2017-03-15")]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
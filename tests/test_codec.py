@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace tests
+
+import logging
+import struct
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from stock_investing import codec
+from stock_investing.codec import (CodecCompression, CodecError)
+from stock_investing.price_store import COLUMN_DATE
+
+COLUMNS = [COLUMN_DATE, "Open", "Close", "Volume", "Ex-Dividend"]
+
+
+def month_arrays():
+    days = np.arange(np.datetime64("2016-02-01"), np.datetime64("2016-03-01")).astype(np.int64)
+    rows = len(days)
+    return {
+        COLUMN_DATE: days,
+        "Open": np.linspace(10.0, 12.8, rows),
+        "Close": np.full(rows, 10.25),
+        "Volume": np.arange(rows, dtype=np.float64) * 1000000.0 + 2.0 ** 53,
+        "Ex-Dividend": np.zeros(rows),
+    }
+
+
+class TestCodec(unittest.TestCase):
+    def assert_round_trip(self, columns, arrays, compression=None):
+        decoded_columns, decoded_arrays = codec.decode(codec.encode(columns, arrays, compression=compression))
+        self.assertEqual(decoded_columns, columns)
+        self.assertEqual(decoded_arrays[COLUMN_DATE].dtype, np.int64)
+        for column in columns:
+            np.testing.assert_array_equal(decoded_arrays[column], arrays[column])
+        return decoded_arrays
+
+    def test_round_trip(self):
+        self.assert_round_trip(COLUMNS, month_arrays())
+
+    def test_round_trip_compressions(self):
+        compressions = [CodecCompression.NONE, CodecCompression.ZLIB, CodecCompression.default()]
+        if codec.zstandard is not None:
+            compressions.append(CodecCompression.ZSTD)
+        if codec.lz4_frame is not None:
+            compressions.append(CodecCompression.LZ4)
+        for compression in compressions:
+            self.assert_round_trip(COLUMNS, month_arrays(), compression=compression)
+
+    def test_round_trip_nan(self):
+        arrays = month_arrays()
+        arrays["Open"][[0, 5]] = np.nan
+        arrays["Volume"][3] = np.nan
+        decoded_arrays = self.assert_round_trip(COLUMNS, arrays)
+        self.assertTrue(np.isnan(decoded_arrays["Volume"][3]))
+
+    def test_round_trip_negative(self):
+        arrays = month_arrays()
+        arrays["Open"] = -arrays["Open"]
+        arrays["Close"][:] = -3.0
+        arrays["Ex-Dividend"][2] = -1e-3
+        self.assert_round_trip(COLUMNS, arrays)
+
+    def test_round_trip_volume_uint64(self):
+        arrays = month_arrays()
+        arrays["Volume"][-1] = float(2 ** 63)
+        self.assert_round_trip(COLUMNS, arrays)
+
+    def test_round_trip_days_before_epoch(self):
+        arrays = month_arrays()
+        arrays[COLUMN_DATE] = arrays[COLUMN_DATE] - 20000
+        self.assert_round_trip(COLUMNS, arrays)
+
+    def test_round_trip_empty(self):
+        arrays = {column: np.empty(0, dtype=np.int64 if column == COLUMN_DATE else np.float64) for column in COLUMNS}
+        self.assert_round_trip(COLUMNS, arrays)
+
+    def test_narrow_types(self):
+        # Integral volumes as uint64 and exact prices as float32, without compression.
+        arrays = month_arrays()
+        rows = len(arrays[COLUMN_DATE])
+        encoded = codec.encode([COLUMN_DATE, "Close", "Volume"], arrays, compression=CodecCompression.NONE)
+        self.assertEqual(len(encoded), codec._HEADER.size + 3 * 2 + len(COLUMN_DATE + "Close" + "Volume") + rows * 16)
+
+    def test_unknown_version(self):
+        encoded = codec.encode(COLUMNS, month_arrays())
+        with self.assertRaises(CodecError):
+            codec.decode(encoded[:4] + struct.pack("<B", codec.CODEC_VERSION + 1) + encoded[5:])
+
+    def test_invalid_magic(self):
+        encoded = codec.encode(COLUMNS, month_arrays())
+        with self.assertRaises(CodecError):
+            codec.decode(b"JSON" + encoded[4:])
+
+    def test_truncated_header(self):
+        with self.assertRaises(CodecError):
+            codec.decode(codec.encode(COLUMNS, month_arrays())[:5])
+
+    def test_unknown_compression(self):
+        encoded = codec.encode(COLUMNS, month_arrays(), compression=CodecCompression.NONE)
+        with self.assertRaises(CodecError):
+            codec.decode(encoded[:5] + struct.pack("<B", 99) + encoded[6:])
+
+
+class TestCacheMonthsDecode(unittest.TestCase):
+    def test_undecodable_entries_dropped(self):
+        # A dropped entry is a cache miss: its month is fetched again.
+        from stock_investing.worker import StockInvestor
+
+        encoded = codec.encode(COLUMNS, month_arrays())
+        cache_values = {
+            "current": encoded,
+            "unknown-version": encoded[:4] + struct.pack("<B", codec.CODEC_VERSION + 1) + encoded[5:],
+            "json": '{"data": []}',
+        }
+        worker = mock.Mock(logger=logging.getLogger(__name__))
+        with self.assertLogs(__name__, level="WARNING"):
+            cached_months = StockInvestor.cache_months_decode(worker, cache_values)
+
+        self.assertEqual(list(cached_months), ["current"])
+        self.assertEqual(len(cached_months["current"]), len(month_arrays()[COLUMN_DATE]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# @namespace tests
+
+import json
+import unittest
+
+import numpy as np
+
+from stock_investing.price_store import COLUMN_DATE
+from stock_investing.wiki_json import (decode_dataset_data, decode_dataset_data_rows)
+
+COLUMNS = [COLUMN_DATE, "Open", "Close", "Volume"]
+
+
+def response_body(data, columns=COLUMNS):
+    return json.dumps({"dataset_data": {"limit": None, "column_names": columns, "data": data}}).encode("utf-8")
+
+
+class TestDecodeDatasetData(unittest.TestCase):
+    def assert_decoded(self, content):
+        """Decoded arrays, checked equal to those of the row by row decode."""
+        columns, arrays = decode_dataset_data(content)
+        columns_rows, arrays_rows = decode_dataset_data_rows(content)
+        self.assertEqual(columns, columns_rows)
+        self.assertEqual(sorted(arrays), sorted(arrays_rows))
+        for column in columns:
+            self.assertEqual(arrays[column].dtype, arrays_rows[column].dtype)
+            np.testing.assert_array_equal(arrays[column], arrays_rows[column])
+        return arrays
+
+    def test_dates(self):
+        arrays = self.assert_decoded(response_body([
+            ["1999-12-31", 1.0, 2.0, 100.0],
+            ["2016-02-29", 1.5, 2.5, 200.0],
+        ]))
+        self.assertEqual(
+            arrays[COLUMN_DATE].astype("datetime64[D]").astype(str).tolist(), ["1999-12-31", "2016-02-29"]
+        )
+
+    def test_negative_values(self):
+        arrays = self.assert_decoded(response_body([
+            ["2017-01-03", 10.5, -1.5, 100.0],
+            ["2017-01-04", -0.25, 2.0, 200.0],
+        ]))
+        self.assertEqual(arrays["Open"].tolist(), [10.5, -0.25])
+        self.assertEqual(arrays["Close"].tolist(), [-1.5, 2.0])
+
+    def test_negative_exponents(self):
+        arrays = self.assert_decoded(
+            b'{"dataset_data":{"column_names":["Date","Open","Close","Volume"],'
+            b'"data":[["2017-01-03",1e-3,-2.5E-4,1e6],["2017-01-04",-1e-3,2.5e-4,-1E2]]}}'
+        )
+        self.assertEqual(arrays["Open"].tolist(), [1e-3, -1e-3])
+        self.assertEqual(arrays["Close"].tolist(), [-2.5e-4, 2.5e-4])
+        self.assertEqual(arrays["Volume"].tolist(), [1e6, -1e2])
+
+    def test_nulls(self):
+        arrays = self.assert_decoded(response_body([
+            ["2017-01-03", None, -1.5, 100.0],
+        ]))
+        self.assertTrue(np.isnan(arrays["Open"][0]))
+
+    def test_empty(self):
+        arrays = self.assert_decoded(response_body([]))
+        self.assertEqual(len(arrays[COLUMN_DATE]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+"""Startup time benchmark of stock_investing/worker.py
+
+Times, in fresh interpreters, the scenarios that should not pay for Pandas
+nor the HTTP stack: importing the worker, --help, and a query answered from
+cache alone. The cache is seeded, offline, into a temporary --cache-dir from
+a generated WIKI_PRICES CSV export (--import-wiki-csv).
+
+Fails (exit 1) if a scenario imports any of its lazily imported modules, or
+takes longer than --max-ms, so that a regression of startup time is caught.
+"""
+
+import os
+import sys
+import time
+import getopt
+import shutil
+import hashlib
+import tempfile
+import statistics
+import subprocess
+import compileall
+import datetime as dt
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKER_PATH = os.path.join(PACKAGE_DIR, "stock_investing", "worker.py")
+
+BENCHMARK_STOCKS = ["BENCHA", "BENCHB", "BENCHC"]
+BENCHMARK_START_DATE = "2016-01-01"
+BENCHMARK_END_DATE = "2017-06-30"
+BENCHMARK_TASKS = ["avg-monthly", "max-daily-profit", "busy-day", "biggest-loser"]
+
+# Imported upon first use only: Pandas and the HTTP stack, never by scenarios answering without fetch.
+LAZY_MODULES = ["pandas", "pyarrow", "requests", "urllib3", "aiohttp", "pyfortified_requests"]
+
+WIKI_PRICES_HEADER = "ticker,date,open,high,low,close,volume,ex-dividend,split_ratio," \
+                     "adj_open,adj_high,adj_low,adj_close,adj_volume\n"
+
+
+def wiki_prices_write(path):
+    """Write a WIKI_PRICES CSV export of business days of benchmark stocks, prices derived from a hash of day."""
+    start = dt.datetime.strptime(BENCHMARK_START_DATE, "%Y-%m-%d").date()
+    end = dt.datetime.strptime(BENCHMARK_END_DATE, "%Y-%m-%d").date()
+    with open(path, "w") as csv_file:
+        csv_file.write(WIKI_PRICES_HEADER)
+        for stock in BENCHMARK_STOCKS:
+            day = start
+            while day <= end:
+                if day.weekday() < 5:
+                    h = int(hashlib.md5((stock + str(day)).encode()).hexdigest()[:8], 16)
+                    open_price = 50 + (h % 1000) / 10.0
+                    close_price = open_price + ((h >> 10) % 200 - 100) / 50.0
+                    high_price = max(open_price, close_price) + ((h >> 3) % 50) / 10.0
+                    low_price = min(open_price, close_price) - ((h >> 5) % 50) / 10.0
+                    volume = float(1000000 + (h % 500000))
+                    prices = [open_price, high_price, low_price, close_price, volume]
+                    csv_file.write(",".join([stock, str(day)] + [str(value) for value in prices + [0.0, 1.0] + prices]))
+                    csv_file.write("\n")
+                day += dt.timedelta(days=1)
+
+
+def scenarios(cache_dir):
+    """Scenarios: name to (command line, lazily imported modules)"""
+    return {
+        "import": ([sys.executable, "-c", "import stock_investing.worker"], LAZY_MODULES + ["pprintpp", "http.server"]),
+        "help": ([sys.executable, WORKER_PATH, "--help"], LAZY_MODULES),
+        "cached-query": (
+            [sys.executable, WORKER_PATH, "--api-key=benchmark", "--cache-dir=" + cache_dir,
+             "--stocks=" + ",".join(BENCHMARK_STOCKS),
+             "--start-date=" + BENCHMARK_START_DATE, "--end-date=" + BENCHMARK_END_DATE,
+             "--tasks=" + ",".join(BENCHMARK_TASKS)],
+            LAZY_MODULES
+        ),
+    }
+
+
+def run(command):
+    """Run command from package directory; return (seconds, stderr)."""
+    start_time = time.perf_counter()
+    completed = subprocess.run(command, cwd=PACKAGE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    seconds = time.perf_counter() - start_time
+    if completed.returncode != 0:
+        raise RuntimeError("{}: exit {}: {}".format(" ".join(command), completed.returncode,
+                                                    completed.stderr.decode("utf-8", "replace")[-2000:]))
+    return seconds, completed.stderr.decode("utf-8", "replace")
+
+
+def imported_modules(command):
+    """Modules imported by command, as reported by -X importtime."""
+    _, stderr = run(command[:1] + ["-X", "importtime"] + command[1:])
+    modules = set()
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and line.count("|") == 2:
+            modules.add(line.rsplit("|", 1)[1].strip())
+    return modules
+
+
+def main():
+    usage = """Usage: {0}
+       [-h | --help]
+       [--repeat=N]
+       [--max-ms=MS]
+    -h | --help: Usage
+    --repeat: Runs of each scenario, median reported. Default: 5
+    --max-ms: Fail when the median of any scenario exceeds MS milliseconds. Default: no limit
+    """.format(sys.argv[0])
+
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "h", ["help", "repeat=", "max-ms="])
+    except getopt.GetoptError as err:
+        print(err)
+        print(usage)
+        sys.exit(1)
+
+    repeat, max_ms = 5, None
+    for opt, val in opts:
+        if opt in ("-h", "--help"):
+            print(usage)
+            sys.exit(0)
+        elif opt in ("--repeat"):
+            repeat = max(1, int(val))
+        elif opt in ("--max-ms"):
+            max_ms = float(val)
+
+    # Timings of imports, not of byte-compilation.
+    compileall.compile_dir(os.path.join(PACKAGE_DIR, "stock_investing"), quiet=1)
+
+    tmp_dir = tempfile.mkdtemp(prefix="stock-investor-benchmark-")
+    failures = []
+    try:
+        cache_dir = os.path.join(tmp_dir, "cache")
+        csv_path = os.path.join(tmp_dir, "wiki_prices.csv")
+        wiki_prices_write(csv_path)
+        run([sys.executable, WORKER_PATH, "--import-wiki-csv=" + csv_path, "--cache-dir=" + cache_dir,
+             "--stocks=" + ",".join(BENCHMARK_STOCKS)])
+
+        for name, (command, lazy_modules) in scenarios(cache_dir).items():
+            run(command)  # Warm up OS file cache
+            timings = [run(command)[0] * 1000.0 for _ in range(repeat)]
+            median_ms = statistics.median(timings)
+            imported = sorted(module for module in lazy_modules if module in imported_modules(command))
+
+            print("{0:<14} median {1:8.1f} ms  min {2:8.1f} ms  max {3:8.1f} ms{4}".format(
+                name, median_ms, min(timings), max(timings),
+                "  imports: {}".format(",".join(imported)) if imported else ""
+            ))
+            if imported:
+                failures.append("{}: imports {}".format(name, ",".join(imported)))
+            if max_ms is not None and median_ms > max_ms:
+                failures.append("{}: {:.1f} ms > {:.1f} ms".format(name, median_ms, max_ms))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    for failure in failures:
+        print("FAIL: " + failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()